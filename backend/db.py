@@ -1,7 +1,18 @@
-"""SQLite database connection and migrations"""
+"""SQLite database connection and migrations.
+
+All rooms share one database file on purpose. Sharding per-room state
+into room_data/<room_id>.sqlite files (ATTACH on demand) was considered
+for write isolation, but the admin overlay aggregates many rooms per
+event and would pay an attach/open per room, WAL already keeps paint
+storms in one room from blocking readers of another, and per-room files
+multiply fsync targets and migration surface. Revisit only if single-file
+write contention shows up in practice.
+"""
 import sqlite3
 import logging
 import os
+import atexit
+import threading
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
@@ -9,166 +20,384 @@ import json
 
 logger = logging.getLogger(__name__)
 
-DB_PATH = "room_data/mechmap.sqlite"
+# Overridable for tests/ops, e.g. MECHMAP_DB_PATH="file::memory:?cache=shared"
+# to run fully in memory (shared cache keeps the pooled connections on one DB).
+DB_PATH = os.environ.get("MECHMAP_DB_PATH", "room_data/mechmap.sqlite")
+
+# WAL is persistent once set on the database file, so only force the
+# journal_mode switch on the first connection of this process.
+_wal_enabled = False
 
 def ensure_data_directory():
-    """Ensure the room_data directory exists"""
-    Path("room_data").mkdir(exist_ok=True)
+    """Ensure the directory holding the database file exists"""
+    if DB_PATH.startswith("file:"):
+        # URI databases (e.g. shared-cache :memory:) have no directory to make
+        return
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
 
-def get_db_connection() -> sqlite3.Connection:
-    """Get a database connection"""
+def _create_connection() -> sqlite3.Connection:
+    """Open and configure a new SQLite connection"""
+    global _wal_enabled
     ensure_data_directory()
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # Connections are bound to the opening thread (the default
+    # check_same_thread=True), which skips sqlite3's per-call Python-level
+    # mutex; cross-thread contention is handled by busy_timeout instead.
+    # cached_statements keeps hot queries compiled across calls; all
+    # repository queries use ? placeholders so their SQL text is stable.
+    conn = sqlite3.connect(
+        DB_PATH,
+        cached_statements=256,
+        uri=DB_PATH.startswith("file:"),
+    )
     conn.row_factory = sqlite3.Row
+    if not _wal_enabled:
+        # Only effective before the first table is written; no-op afterwards
+        conn.execute("PRAGMA page_size=8192")
+        # WAL lets readers proceed concurrently with a single writer and
+        # cuts fsyncs per commit compared to the rollback journal.
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled = True
+    # Memory-map the database so reads come straight from the page cache
+    # without a pager memcpy (256 MiB covers the whole file comfortably)
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA busy_timeout=5000")
+    # Default autocheckpoint (1000 pages) causes write stalls under bursty
+    # paint traffic; a larger threshold amortizes checkpoint work
+    conn.execute("PRAGMA wal_autocheckpoint=10000")
+    # Schema uses ON DELETE CASCADE / SET NULL, which need this enabled
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+# One lazily-opened connection per thread. Reusing the connection preserves
+# SQLite's page cache and statement cache across requests and avoids the
+# repeated openat()/close() of the .sqlite/-wal/-shm files that a
+# connect-per-call pattern pays. The ASGI thread pool is bounded, so the
+# number of live connections stays small.
+_tls = threading.local()
+_open_connections: List[sqlite3.Connection] = []
+_open_connections_lock = threading.Lock()
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get this thread's database connection, opening it on first use"""
+    conn = getattr(_tls, 'conn', None)
+    if conn is None:
+        conn = _create_connection()
+        _tls.conn = conn
+        with _open_connections_lock:
+            _open_connections.append(conn)
     return conn
 
+def release_db_connection(conn: sqlite3.Connection) -> None:
+    """Release a connection obtained from get_db_connection.
+
+    The connection stays open, bound to its owning thread, so this is a
+    no-op; it exists so call-sites keep a clear acquire/release shape.
+    """
+
+def wal_checkpoint() -> None:
+    """Checkpoint and truncate the WAL file (ops escape hatch)"""
+    get_db_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+@atexit.register
+def _close_connections() -> None:
+    """Close any connections still open at interpreter shutdown"""
+    with _open_connections_lock:
+        for conn in _open_connections:
+            try:
+                # Let SQLite refresh stats for indexes whose usage changed;
+                # cheap on clean shutdown, keeps the planner current. Skipped
+                # for connections owned by other threads.
+                conn.execute("PRAGMA optimize")
+            except Exception:
+                pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _open_connections.clear()
+
 @contextmanager
 def db_transaction():
     """Context manager for database transactions"""
     conn = get_db_connection()
     try:
+        conn.execute("BEGIN IMMEDIATE")
         yield conn
         conn.commit()
     except Exception as e:
         conn.rollback()
         logger.error(f"Database transaction failed: {e}")
         raise
-    finally:
-        conn.close()
+
+CURRENT_SCHEMA_VERSION = 4
+
+_SCHEMA_SQL = """
+BEGIN IMMEDIATE;
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_login REAL,
+    is_admin INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS tokens (
+    token TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    owner_username TEXT,
+    has_password INTEGER NOT NULL DEFAULT 0,
+    password_hash TEXT,
+    created_at REAL NOT NULL,
+    last_activity REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY (owner_username) REFERENCES users(username) ON DELETE SET NULL
+);
+
+-- Sparse: only non-default colors get a row. Kept row-per-hex on purpose:
+-- keys and fill colors are arbitrary strings (named CSS colors included),
+-- so a packed per-room blob would need a palette indirection and a full
+-- blob rebuild on every brush stroke; the covering index already serves
+-- whole-map loads from one btree range scan.
+CREATE TABLE IF NOT EXISTS hexes (
+    room_id TEXT NOT NULL,
+    hex_key TEXT NOT NULL,
+    fill_color TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    updated_by TEXT,
+    PRIMARY KEY (room_id, hex_key),
+    FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS lines (
+    room_id TEXT NOT NULL,
+    line_id TEXT PRIMARY KEY,
+    payload_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    created_by TEXT,
+    FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS units (
+    room_id TEXT NOT NULL,
+    unit_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    color TEXT NOT NULL,
+    hex_key TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    created_by TEXT,
+    moved_at REAL,
+    moved_by TEXT,
+    FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_hexes_room ON hexes(room_id);
+CREATE INDEX IF NOT EXISTS idx_lines_room ON lines(room_id);
+CREATE INDEX IF NOT EXISTS idx_units_room ON units(room_id);
+CREATE INDEX IF NOT EXISTS idx_tokens_username ON tokens(username);
+CREATE INDEX IF NOT EXISTS idx_tokens_expires ON tokens(expires_at);
+
+COMMIT;
+"""
+
+def _migration_0001_base_schema(cursor: sqlite3.Cursor) -> None:
+    """Base schema: users/tokens/rooms/hexes/lines/units plus indexes.
+
+    The DDL ships as one executescript blob: a single Python-to-C call
+    parses the whole script, and the embedded BEGIN/COMMIT means one fsync
+    for all of it. Written to be safe on databases that predate schema
+    versioning (user_version == 0): tables use IF NOT EXISTS and
+    late-added columns are probed before ALTER.
+    """
+    cursor.executescript(_SCHEMA_SQL)
+
+    # Columns added after the original schema. A single sqlite_master scan
+    # covers both tables instead of one PRAGMA table_info round-trip (and
+    # full row materialization) per table.
+    required_columns: dict[str, list[tuple[str, str]]] = {
+        "units": [
+            ("icon_path", "TEXT"),
+            ("tint_color", "TEXT"),
+            ("description", "TEXT"),
+            ("parent_unit_id", "TEXT"),
+        ],
+        "rooms": [
+            ("map_filename", "TEXT"),
+        ],
+    }
+
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' AND name IN ('units', 'rooms')"
+    )
+    table_sql = {row["name"]: row["sql"] for row in cursor.fetchall()}
+
+    missing = [
+        (table_name, column_name, column_type)
+        for table_name, columns in required_columns.items()
+        for column_name, column_type in columns
+        if column_name not in table_sql.get(table_name, "")
+    ]
+    if not missing:
+        # Common case on upgraded databases: no ALTERs, no schema lock taken
+        return
+
+    # Batch the ALTERs so the schema cookie flushes once on COMMIT instead
+    # of once per added column
+    cursor.execute("BEGIN IMMEDIATE")
+    for table_name, column_name, column_type in missing:
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+        logger.info(f"Added {table_name} column: {column_name} ({column_type})")
+    cursor.execute("COMMIT")
+
+def _migration_0002_covering_indexes(cursor: sqlite3.Cursor) -> None:
+    """Replace single-column room indexes with covering indexes.
+
+    Including the projected columns lets the room-scoped list queries be
+    answered from the index btree alone, without a rowid lookup back into
+    the table per row. lines.payload_json is too large to include, so that
+    index only covers the key columns.
+    """
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("DROP INDEX IF EXISTS idx_hexes_room")
+    cursor.execute("DROP INDEX IF EXISTS idx_lines_room")
+    cursor.execute("DROP INDEX IF EXISTS idx_units_room")
+    cursor.execute("CREATE INDEX idx_hexes_room ON hexes(room_id, hex_key, fill_color)")
+    cursor.execute("CREATE INDEX idx_lines_room ON lines(room_id, line_id)")
+    cursor.execute("CREATE INDEX idx_units_room ON units(room_id, unit_id, hex_key, name, color)")
+    cursor.execute("COMMIT")
+
+def _migration_0003_lines_payload_blob(cursor: sqlite3.Cursor) -> None:
+    """Store line payloads as compact JSON bytes in a BLOB column.
+
+    TEXT storage forced a UTF-8 encode/decode through SQLite's text layer
+    on every insert/read; BLOB hands the serialized bytes straight through.
+    (JSONB would need SQLite 3.45+, so compact JSON bytes are used instead.)
+    """
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        CREATE TABLE lines_new (
+            room_id TEXT NOT NULL,
+            line_id TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            created_by TEXT,
+            FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO lines_new (room_id, line_id, payload, created_at, created_by)
+        SELECT room_id, line_id, CAST(payload_json AS BLOB), created_at, created_by FROM lines
+    """)
+    cursor.execute("DROP TABLE lines")
+    cursor.execute("ALTER TABLE lines_new RENAME TO lines")
+    cursor.execute("CREATE INDEX idx_lines_room ON lines(room_id, line_id)")
+    cursor.execute("COMMIT")
+
+def _migration_0004_strict_without_rowid(cursor: sqlite3.Cursor) -> None:
+    """Rebuild hexes and tokens as STRICT, WITHOUT ROWID tables.
+
+    Both tables are keyed by TEXT primary keys, so the hidden rowid column
+    and its extra PK-to-rowid index were pure overhead; WITHOUT ROWID
+    stores rows in PK order, making the room-scoped range scans
+    sequential. STRICT also lets SQLite skip runtime type-affinity
+    conversion.
+    """
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        CREATE TABLE hexes_new (
+            room_id TEXT NOT NULL,
+            hex_key TEXT NOT NULL,
+            fill_color TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            updated_by TEXT,
+            PRIMARY KEY (room_id, hex_key),
+            FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
+        ) WITHOUT ROWID, STRICT
+    """)
+    cursor.execute("INSERT INTO hexes_new SELECT * FROM hexes")
+    cursor.execute("DROP TABLE hexes")
+    cursor.execute("ALTER TABLE hexes_new RENAME TO hexes")
+    cursor.execute("CREATE INDEX idx_hexes_room ON hexes(room_id, hex_key, fill_color)")
+
+    cursor.execute("""
+        CREATE TABLE tokens_new (
+            token TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL,
+            FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+        ) WITHOUT ROWID, STRICT
+    """)
+    cursor.execute("INSERT INTO tokens_new SELECT * FROM tokens")
+    cursor.execute("DROP TABLE tokens")
+    cursor.execute("ALTER TABLE tokens_new RENAME TO tokens")
+    cursor.execute("CREATE INDEX idx_tokens_username ON tokens(username)")
+    cursor.execute("CREATE INDEX idx_tokens_expires ON tokens(expires_at)")
+    cursor.execute("COMMIT")
+
+_MIGRATIONS: Dict[int, Any] = {
+    1: _migration_0001_base_schema,
+    2: _migration_0002_covering_indexes,
+    3: _migration_0003_lines_payload_blob,
+    4: _migration_0004_strict_without_rowid,
+}
 
 def init_database():
-    """Initialize database schema"""
+    """Initialize database schema, running only pending migrations.
+
+    PRAGMA user_version records the schema version in the database header,
+    so a warm start at the current version costs a single header read
+    instead of re-running every CREATE/ALTER probe.
+    """
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                username TEXT PRIMARY KEY,
-                password_hash TEXT NOT NULL,
-                created_at REAL NOT NULL,
-                last_login REAL,
-                is_admin INTEGER NOT NULL DEFAULT 0
-            )
-        """)
-        
-        # Tokens table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tokens (
-                token TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                created_at REAL NOT NULL,
-                expires_at REAL,
-                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
-            )
-        """)
-        
-        # Rooms table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS rooms (
-                room_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                owner_username TEXT,
-                has_password INTEGER NOT NULL DEFAULT 0,
-                password_hash TEXT,
-                created_at REAL NOT NULL,
-                last_activity REAL NOT NULL,
-                version INTEGER NOT NULL DEFAULT 1,
-                FOREIGN KEY (owner_username) REFERENCES users(username) ON DELETE SET NULL
-            )
-        """)
-        
-        # Hexes table (sparse - only non-default colors)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hexes (
-                room_id TEXT NOT NULL,
-                hex_key TEXT NOT NULL,
-                fill_color TEXT NOT NULL,
-                updated_at REAL NOT NULL,
-                updated_by TEXT,
-                PRIMARY KEY (room_id, hex_key),
-                FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Lines table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lines (
-                room_id TEXT NOT NULL,
-                line_id TEXT PRIMARY KEY,
-                payload_json TEXT NOT NULL,
-                created_at REAL NOT NULL,
-                created_by TEXT,
-                FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Units table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS units (
-                room_id TEXT NOT NULL,
-                unit_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                color TEXT NOT NULL,
-                hex_key TEXT NOT NULL,
-                created_at REAL NOT NULL,
-                created_by TEXT,
-                moved_at REAL,
-                moved_by TEXT,
-                FOREIGN KEY (room_id) REFERENCES rooms(room_id) ON DELETE CASCADE
-            )
-        """)
-
-        def ensure_units_columns() -> None:
-            cursor.execute("PRAGMA table_info(units)")
-            existing_columns = {row["name"] for row in cursor.fetchall()}
-
-            required_columns: list[tuple[str, str]] = [
-                ("icon_path", "TEXT"),
-                ("tint_color", "TEXT"),
-                ("description", "TEXT"),
-                ("parent_unit_id", "TEXT"),
-            ]
-
-            for column_name, column_type in required_columns:
-                if column_name in existing_columns:
-                    continue
-                cursor.execute(f"ALTER TABLE units ADD COLUMN {column_name} {column_type}")
-                logger.info(f"Added units column: {column_name} ({column_type})")
-
-        ensure_units_columns()
-        
-        # Ensure rooms table has map_filename column
-        def ensure_rooms_columns() -> None:
-            cursor.execute("PRAGMA table_info(rooms)")
-            existing_columns = {row["name"] for row in cursor.fetchall()}
-            
-            if "map_filename" not in existing_columns:
-                cursor.execute("ALTER TABLE rooms ADD COLUMN map_filename TEXT")
-                logger.info("Added rooms column: map_filename (TEXT)")
-        
-        ensure_rooms_columns()
-        
-        # Indexes for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_hexes_room ON hexes(room_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lines_room ON lines(room_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_units_room ON units(room_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tokens_username ON tokens(username)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tokens_expires ON tokens(expires_at)")
-        
-        conn.commit()
+
+        current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if current_version == CURRENT_SCHEMA_VERSION:
+            return
+
+        # Each migration runs in its own transaction (executescript cannot
+        # nest inside an open one), with user_version recording progress so
+        # a failure resumes from the right migration on the next start.
+        for version in range(current_version + 1, CURRENT_SCHEMA_VERSION + 1):
+            try:
+                _MIGRATIONS[version](cursor)
+            except Exception as e:
+                if conn.in_transaction:
+                    cursor.execute("ROLLBACK")
+                logger.error(f"Failed to initialize database: {e}")
+                raise
+            cursor.execute(f"PRAGMA user_version = {version}")
+            logger.info(f"Applied schema migration {version}")
+
+        # Refresh planner statistics so the covering indexes get picked
+        cursor.execute("ANALYZE")
         logger.info("Database schema initialized")
-        
-    except Exception as e:
-        conn.rollback()
-        logger.error(f"Failed to initialize database: {e}")
-        raise
+
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+# Once the database has tables it never "un-exists", so remember the
+# positive answer and skip the sqlite_master probe on later calls.
+_database_exists_memo = False
 
 def database_exists() -> bool:
     """Check if database file exists and has tables"""
+    global _database_exists_memo
+    if _database_exists_memo:
+        return True
     if not os.path.exists(DB_PATH):
         return False
     # Check if database has tables (not just an empty file)
@@ -177,7 +406,8 @@ def database_exists() -> bool:
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' LIMIT 1")
         has_tables = cursor.fetchone() is not None
-        conn.close()
+        release_db_connection(conn)
+        _database_exists_memo = has_tables
         return has_tables
     except Exception:
         return False
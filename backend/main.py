@@ -1,5 +1,7 @@
 import json
-import numpy as np
+import logging.handlers
+import queue
+import re
 import logging
 import uuid
 from typing import Dict, Set, Any, Optional
@@ -8,40 +10,106 @@ import socketio
 import os
 from pathlib import Path
 import hashlib
+import hmac
 import secrets
+# asyncio's default clock is time.monotonic, so calling it directly gives
+# the same timebase as the loop without the get_event_loop() lookup
+from time import monotonic, monotonic_ns
 from datetime import datetime, timedelta
 
 
 from fastapi import FastAPI, Request, HTTPException, Depends, UploadFile, File
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from starlette.datastructures import UploadFile as StarletteUploadFile
 from contextlib import asynccontextmanager
 from pydantic import BaseModel
 
 # Database imports
-from db import init_database, database_exists, db_transaction
+from db import init_database, database_exists, db_transaction, wal_checkpoint
 from repository import (
     create_user, get_user, update_user_last_login, get_all_users, set_user_admin,
+    update_user_password_hash,
     create_token, get_token_username, delete_token,
     create_room, get_room, get_room_state, update_room_activity, 
-    increment_room_version, delete_room, get_all_rooms,
+    delete_room, get_all_rooms,
     update_hex, erase_hex, add_line, delete_lines_by_hex,
     add_unit, move_unit, delete_unit, delete_units_by_hex,
     replace_room_state, migrate_json_to_sqlite,
-    update_unit, reparent_unit, get_unit, update_room_map
+    update_unit, reparent_unit, get_unit, update_room_map,
+    flush_room_meta
 )
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+log = logging.getLogger('mechmap')
+
+def setup_async_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so handler I/O runs off-loop.
+
+    Socket handlers only pay a queue put; the actual stream write happens
+    in the QueueListener's thread instead of serializing every event
+    behind stdout.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    record_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.handlers = [logging.handlers.QueueHandler(record_queue)]
+    listener = logging.handlers.QueueListener(
+        record_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+# orjson encodes in C, several times faster than stdlib json on the nested
+# hex/line/unit payloads every broadcast carries; fall back to stdlib when
+# it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    class OrjsonWrapper:
+        """Adapter exposing the stdlib json signature python-socketio expects"""
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    _socketio_json = OrjsonWrapper
+else:
+    _socketio_json = json
+
 # Room and user management
 rooms: Dict[str, Dict[str, Any]] = {}  # room_id -> room_data
 user_sessions: Dict[str, Dict[str, Any]] = {}  # sid -> user_data
 users_db: Dict[str, Dict[str, Any]] = {}  # username -> user_data
+users_lower_index: Dict[str, str] = {}  # username.lower() -> canonical username
 user_tokens: Dict[str, str] = {}  # token -> username
 admin_rooms: Dict[str, Dict[str, Any]] = {}  # admin_room_id -> admin_room_data
+# Reverse index: source room_id -> admin room ids with a toggle for it, so
+# per-edit notification doesn't scan every admin room. Any code that adds
+# or removes a room_toggles entry must keep this in sync via
+# link_room_to_admin_room / unlink_room_from_admin_room.
+room_to_admin_rooms: Dict[str, Set[str]] = {}
+
+def link_room_to_admin_room(room_id: str, admin_room_id: str) -> None:
+    room_to_admin_rooms.setdefault(room_id, set()).add(admin_room_id)
+
+def unlink_room_from_admin_room(room_id: str, admin_room_id: str) -> None:
+    watchers = room_to_admin_rooms.get(room_id)
+    if watchers is not None:
+        watchers.discard(admin_room_id)
+        if not watchers:
+            del room_to_admin_rooms[room_id]
 
 # File paths
 BACKEND_DIR = Path(__file__).resolve().parent
@@ -119,18 +187,36 @@ class CreateRoomRequest(BaseModel):
     room_name: str
     token: str
 
+# New hashes embed the KDF and iteration count so the work factor can be
+# raised again later without breaking stored credentials; bare salt:hash
+# values are the legacy 100k-iteration format and get rehashed on the next
+# successful login.
+PBKDF2_ITERATIONS = 600000
+_LEGACY_PBKDF2_ITERATIONS = 100000
+
 def hash_password(password: str) -> str:
     """Hash password with salt"""
     salt = secrets.token_hex(16)
-    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}:{password_hash.hex()}"
+    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256:{PBKDF2_ITERATIONS}:{salt}:{password_hash.hex()}"
+
+def password_hash_is_legacy(hashed: str) -> bool:
+    """True for hashes still in the old unversioned 100k format"""
+    return not hashed.startswith('pbkdf2_sha256:')
 
 def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash"""
     try:
-        salt, password_hash = hashed.split(':')
-        new_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return password_hash == new_hash.hex()
+        if password_hash_is_legacy(hashed):
+            salt, _, password_hash = hashed.partition(':')
+            iterations = _LEGACY_PBKDF2_ITERATIONS
+        else:
+            _, iterations_str, salt, password_hash = hashed.split(':')
+            iterations = int(iterations_str)
+        new_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+        # Compare raw digests in constant time; skips the .hex() round-trip
+        # and doesn't leak a timing signal on the first differing byte
+        return hmac.compare_digest(bytes.fromhex(password_hash), new_hash)
     except:
         return False
 
@@ -146,14 +232,29 @@ def get_user_from_token(token: str) -> Optional[str]:
         return db_username
     return user_tokens.get(token)
 
+def get_user_cached(username: str) -> Optional[Dict[str, Any]]:
+    """User record from the in-memory mirror, falling back to the database.
+
+    users_db is kept in sync by register/login/admin updates, so the
+    common path is a dict lookup instead of a SQLite round-trip per
+    socket event; a miss loads from the database and back-fills.
+    """
+    user = users_db.get(username)
+    if user is not None:
+        return user
+    user = get_user(username)
+    if user is not None:
+        users_db[username] = user
+        users_lower_index[username.lower()] = username
+    return user
+
 def is_admin_user(username: str) -> bool:
     """Check if a user has admin privileges"""
     if not username:
         return False
-    user = get_user(username)
+    user = get_user_cached(username)
     if not user:
-        # Fallback to in-memory for backward compatibility
-        return users_db.get(username, {}).get('is_admin', False)
+        return False
     return user.get('is_admin', False)
 
 def require_admin_bearer(request: Request) -> str:
@@ -163,7 +264,7 @@ def require_admin_bearer(request: Request) -> str:
         raise HTTPException(status_code=401, detail="No valid token provided")
     token = auth_header.split(' ')[1]
     username = get_user_from_token(token)
-    if not username or not get_user(username):
+    if not username or not get_user_cached(username):
         raise HTTPException(status_code=401, detail="Invalid token")
     if not is_admin_user(username):
         raise HTTPException(status_code=403, detail="Admin privileges required")
@@ -178,87 +279,99 @@ def create_admin_room(room_name="Admin Room", owner=None):
         'name': room_name,
         'room_toggles': {},  # room_id -> {enabled: bool, room_name: str}
         'users': {},     # sid -> user_info
-        'created_at': asyncio.get_event_loop().time(),
-        'last_activity': asyncio.get_event_loop().time(),
+        'created_at': monotonic(),
+        'last_activity': monotonic(),
         'owner': owner,  # username of admin room owner
         'is_admin_room': True
     }
 
+# Per-room admin projections (enriched lines/units plus colored-hex
+# contributions), cached against the room version so an edit in one room
+# doesn't force re-reading and re-enriching every other enabled room.
+_admin_projection_cache: Dict[str, tuple] = {}  # room_id -> (version, projection)
+
+def get_admin_room_projection(room_id: str) -> Optional[Dict[str, Any]]:
+    """Get a room's admin-view projection, rebuilt only when its version changes"""
+    room_meta = get_room(room_id)
+    if not room_meta:
+        _admin_projection_cache.pop(room_id, None)
+        return None
+
+    cached = _admin_projection_cache.get(room_id)
+    if cached and cached[0] == room_meta['version']:
+        return cached[1]
+
+    room_state = get_room_state(room_id)
+    room_name = room_meta['name']
+
+    projection = {
+        'room_name': room_name,
+        # Only colored hexes contribute to the admin overlay
+        'colored_hexes': [
+            (hex_key, hex_data['fillColor'])
+            for hex_key, hex_data in room_state['hex_data'].items()
+            if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray'
+        ],
+        # Add room information to lines with prefixed keys for conflict
+        # resolution. start/end are carried by reference on purpose: the
+        # admin view only reads them, and copying them per line doubled
+        # the dict allocations of every aggregate rebuild while keeping
+        # the keys identical anyway.
+        'lines': [
+            line | {
+                'room_id': room_id,
+                'room_name': room_name,
+                'line_id': f"{room_id}_{line.get('id', 'line')}",
+            }
+            for line in room_state['lines']
+        ],
+        # Add room information to units with prefixed IDs for conflict resolution
+        'units': [
+            unit | {
+                'room_id': room_id,
+                'room_name': room_name,
+                'unit_id': f"{room_id}_{unit.get('id', 'unit')}",
+                'is_read_only': True  # Mark as read-only in admin view
+            }
+            for unit in room_state['units']
+        ],
+    }
+    _admin_projection_cache[room_id] = (room_meta['version'], projection)
+    return projection
+
 def get_aggregated_room_data(admin_room_id: str) -> Dict[str, Any]:
     """Get aggregated hex_data and lines from enabled rooms for admin room"""
     if admin_room_id not in admin_rooms:
         return {'hex_data': {}, 'lines': [], 'units': []}
-    
+
     admin_room = admin_rooms[admin_room_id]
     aggregated_hex_data = {}
     aggregated_lines = []
     aggregated_units = []
-    
+
     for room_id, toggle_data in admin_room['room_toggles'].items():
         if toggle_data.get('enabled', False):
-            # Get room state from database
-            room_state = get_room_state(room_id)
-            room_meta = get_room(room_id)
-            if not room_meta:
+            projection = get_admin_room_projection(room_id)
+            if not projection:
                 continue
-            
-            room = {
-                'name': room_meta['name'],
-                'hex_data': room_state['hex_data'],
-                'lines': room_state['lines'],
-                'units': room_state['units']
-            }
-            
+
             # Keep original hex keys but add room metadata for layered display
-            for hex_key, hex_data in room['hex_data'].items():
-                if hex_key not in aggregated_hex_data:
-                    # First room to have this hex - create base structure
-                    aggregated_hex_data[hex_key] = {
-                        'fillColor': hex_data.get('fillColor', 'lightgray'),
-                        'rooms': []
-                    }
-                
-                # Add this room's data to the hex
-                if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray':
-                    aggregated_hex_data[hex_key]['rooms'].append({
-                        'room_id': room_id,
-                        'room_name': room['name'],
-                        'fillColor': hex_data['fillColor']
-                    })
-                    
-                    # If this is the first colored hex from any room, use its color as primary
-                    if aggregated_hex_data[hex_key]['fillColor'] == 'lightgray':
-                        aggregated_hex_data[hex_key]['fillColor'] = hex_data['fillColor']
-            
-            # Add room information to lines with prefixed keys for conflict resolution
-            for line in room['lines']:
-                aggregated_line = {
-                    **line,
-                    'room_id': room_id,
-                    'room_name': room['name'],
-                    'line_id': f"{room_id}_{line.get('id', 'line')}",  # Add unique line ID
-                    'start': {
-                        **line['start']
-                        # Keep original hex keys for start/end so lines connect properly
-                    },
-                    'end': {
-                        **line['end']
-                        # Keep original hex keys for start/end so lines connect properly
-                    }
-                }
-                aggregated_lines.append(aggregated_line)
-            
-            # Add room information to units with prefixed IDs for conflict resolution
-            for unit in room.get('units', []):
-                aggregated_unit = {
-                    **unit,
+            for hex_key, fill_color in projection['colored_hexes']:
+                entry = aggregated_hex_data.setdefault(
+                    hex_key, {'fillColor': 'lightgray', 'rooms': []}
+                )
+                entry['rooms'].append({
                     'room_id': room_id,
-                    'room_name': room['name'],
-                    'unit_id': f"{room_id}_{unit.get('id', 'unit')}",  # Add unique unit ID
-                    'is_read_only': True  # Mark as read-only in admin view
-                }
-                aggregated_units.append(aggregated_unit)
-    
+                    'room_name': projection['room_name'],
+                    'fillColor': fill_color
+                })
+                # First colored hex from any room provides the primary color
+                if entry['fillColor'] == 'lightgray':
+                    entry['fillColor'] = fill_color
+
+            aggregated_lines.extend(projection['lines'])
+            aggregated_units.extend(projection['units'])
+
     return {
         'hex_data': aggregated_hex_data,
         'lines': aggregated_lines,
@@ -269,59 +382,172 @@ def ensure_data_directory():
     """Ensure the room_data directory exists"""
     Path("room_data").mkdir(exist_ok=True)
 
-def save_rooms_to_file():
-    """Save current rooms state to JSON file"""
+# Dirty tracking so periodic_save only rewrites what actually changed since
+# the last save: mutation handlers record the touched room ids, deletions
+# record ids whose shard files must go away, and the users flag covers the
+# (small) users file as a whole.
+dirty_rooms: Set[str] = set()
+_deleted_room_ids: Set[str] = set()
+_users_dirty = False
+
+# Per-room shard files; only dirty shards are rewritten, so an idle server
+# does zero persistence I/O and an active one touches a few KB per save
+# instead of re-serializing every room.
+ROOM_SHARDS_DIR = "room_data/rooms"
+
+def mark_rooms_dirty(room_id: str):
+    dirty_rooms.add(room_id)
+    _deleted_room_ids.discard(room_id)
+
+def mark_room_deleted(room_id: str):
+    dirty_rooms.discard(room_id)
+    _deleted_room_ids.add(room_id)
+
+def mark_users_dirty():
+    global _users_dirty
+    _users_dirty = True
+
+def snapshot_room_data(room: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow-snapshot one room's persisted fields"""
+    return {
+        'name': room['name'],
+        'hex_data': dict(room['hex_data']),
+        'lines': list(room['lines']),
+        'units': list(room.get('units', [])),  # Include units in save
+        'created_at': room['created_at'],
+        'last_activity': room['last_activity'],
+        'owner': room.get('owner'),  # Add owner info
+        'has_password': room.get('has_password', False),  # Save password flag
+        'password_hash': room.get('password_hash')  # Save password hash
+        # Note: we don't save 'users' as they are session-specific
+    }
+
+def snapshot_rooms_data() -> Dict[str, Any]:
+    """Shallow-snapshot the rooms state for serialization off the event loop"""
+    rooms_data = {}
+    for room_id, room in rooms.items():
+        rooms_data[room_id] = {
+            'name': room['name'],
+            'hex_data': dict(room['hex_data']),
+            'lines': list(room['lines']),
+            'units': list(room.get('units', [])),  # Include units in save
+            'created_at': room['created_at'],
+            'last_activity': room['last_activity'],
+            'owner': room.get('owner'),  # Add owner info
+            'has_password': room.get('has_password', False),  # Save password flag
+            'password_hash': room.get('password_hash')  # Save password hash
+            # Note: we don't save 'users' as they are session-specific
+        }
+    return rooms_data
+
+def _dump_persisted_json(data: Dict[str, Any]) -> bytes:
+    """Serialize a rooms/users snapshot, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _load_persisted_json(path: str) -> Dict[str, Any]:
+    """Read a rooms/users JSON file, via orjson when available"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def write_rooms_file(rooms_data: Dict[str, Any]):
+    """Serialize and write a rooms snapshot (safe to run in a worker thread)"""
     try:
         ensure_data_directory()
-        
-        # Prepare rooms data for JSON serialization
-        rooms_data = {}
-        for room_id, room in rooms.items():
-            rooms_data[room_id] = {
-                'name': room['name'],
-                'hex_data': room['hex_data'],
-                'lines': room['lines'],
-                'units': room.get('units', []),  # Include units in save
-                'created_at': room['created_at'],
-                'last_activity': room['last_activity'],
-                'owner': room.get('owner'),  # Add owner info
-                'has_password': room.get('has_password', False),  # Save password flag
-                'password_hash': room.get('password_hash')  # Save password hash
-                # Note: we don't save 'users' as they are session-specific
-            }
-        
-        # Write to file
-        with open(ROOMS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(rooms_data, f, indent=2, ensure_ascii=False)
+
+        # Serialize in one shot and swap the file into place atomically so a
+        # crash mid-write can never leave a torn rooms file behind
+        tmp_file = ROOMS_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_dump_persisted_json(rooms_data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, ROOMS_FILE)
         
         logging.info(f"Saved {len(rooms_data)} rooms to {ROOMS_FILE}")
         
     except Exception as e:
         logging.error(f"Error saving rooms to file: {e}")
 
-def save_users_to_file():
-    """Save users database to JSON file"""
+def write_room_shards(shards: Dict[str, Optional[Dict[str, Any]]]):
+    """Write (or remove) per-room shard files; safe to run in a thread.
+
+    A None value means the room was deleted and its shard is unlinked.
+    Each shard gets the same write-tmp-then-rename treatment as the
+    legacy whole-file save.
+    """
+    try:
+        Path(ROOM_SHARDS_DIR).mkdir(parents=True, exist_ok=True)
+        for room_id, room_data in shards.items():
+            shard_path = os.path.join(ROOM_SHARDS_DIR, f"{room_id}.json")
+            if room_data is None:
+                try:
+                    os.unlink(shard_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            tmp_file = shard_path + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(_dump_persisted_json(room_data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, shard_path)
+        logging.info(f"Saved {len(shards)} room shards to {ROOM_SHARDS_DIR}")
+    except Exception as e:
+        logging.error(f"Error writing room shards: {e}")
+
+def load_room_shards() -> Dict[str, Any]:
+    """Load all per-room shard files; empty dict when none exist"""
+    shards: Dict[str, Any] = {}
+    if not os.path.isdir(ROOM_SHARDS_DIR):
+        return shards
+    for entry in os.scandir(ROOM_SHARDS_DIR):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            shards[entry.name[:-len('.json')]] = _load_persisted_json(entry.path)
+        except Exception as e:
+            logging.error(f"Error loading room shard {entry.name}: {e}")
+    return shards
+
+def save_rooms_to_file():
+    """Save current rooms state to JSON file"""
+    write_rooms_file(snapshot_rooms_data())
+
+def write_users_file(users_data: Dict[str, Any]):
+    """Serialize and write a users snapshot (safe to run in a worker thread)"""
     try:
         ensure_data_directory()
         
-        # Write to file
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(users_db, f, indent=2, ensure_ascii=False)
+        # Same atomic-rename dance as write_rooms_file
+        tmp_file = USERS_FILE + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_dump_persisted_json(users_data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, USERS_FILE)
         
-        logging.info(f"Saved {len(users_db)} users to {USERS_FILE}")
+        logging.info(f"Saved {len(users_data)} users to {USERS_FILE}")
         
     except Exception as e:
         logging.error(f"Error saving users to file: {e}")
 
+def save_users_to_file():
+    """Save users database to JSON file"""
+    write_users_file({username: dict(user) for username, user in users_db.items()})
+
 def load_rooms_from_file():
     """Load rooms state from JSON file on startup"""
     try:
-        if not os.path.exists(ROOMS_FILE):
+        if not os.path.isdir(ROOM_SHARDS_DIR) and not os.path.exists(ROOMS_FILE):
             logging.info("No existing rooms file found, starting with empty rooms")
             return
         
-        with open(ROOMS_FILE, 'r', encoding='utf-8') as f:
-            rooms_data = json.load(f)
+        rooms_data = load_room_shards()
+        if not rooms_data:
+            rooms_data = _load_persisted_json(ROOMS_FILE)
         
         # Restore rooms data
         for room_id, room_data in rooms_data.items():
@@ -343,23 +569,56 @@ def load_rooms_from_file():
     except Exception as e:
         logging.error(f"Error loading rooms from file: {e}")
 
+# Icon listing cache: the assets tree rarely changes, so remember the sorted
+# result (and its pre-encoded JSON response body) and only rescan when the
+# directory mtime moves.
+_icons_cache: Optional[tuple[int, list[str]]] = None
+_icons_json_bytes: Optional[bytes] = None
+
+def _encode_icons_response(icon_paths: list[str]) -> bytes:
+    payload = {"icons": icon_paths}
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def unit_icons_response_bytes() -> bytes:
+    """Pre-encoded /api/unit-icons body, refreshed with the icons cache"""
+    global _icons_json_bytes
+    icons = list_unit_icons()
+    if _icons_json_bytes is None:
+        _icons_json_bytes = _encode_icons_response(icons)
+    return _icons_json_bytes
+
 def list_unit_icons() -> list[str]:
     """List all available unit icon paths (relative to UNIT_ICONS_DIR)."""
+    global _icons_cache
     if not UNIT_ICONS_DIR.exists():
         raise FileNotFoundError(f"Unit icons directory not found: {UNIT_ICONS_DIR}")
     if not UNIT_ICONS_DIR.is_dir():
         raise NotADirectoryError(f"Unit icons path is not a directory: {UNIT_ICONS_DIR}")
 
+    dir_mtime = os.stat(UNIT_ICONS_DIR).st_mtime_ns
+    if _icons_cache is not None and _icons_cache[0] == dir_mtime:
+        return _icons_cache[1]
+
+    # Manual scandir walk: no per-entry Path allocation, and entry.is_dir()
+    # comes from the dirent without an extra stat on most filesystems
+    base = str(UNIT_ICONS_DIR)
+    prefix_len = len(base) + 1
     icon_paths: list[str] = []
-    for root, _, files in os.walk(UNIT_ICONS_DIR):
-        for file_name in files:
-            if not file_name.lower().endswith(".png"):
-                continue
-            full_path = Path(root) / file_name
-            rel_path = full_path.relative_to(UNIT_ICONS_DIR).as_posix()
-            icon_paths.append(rel_path)
+    pending = [base]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(".png"):
+                    icon_paths.append(entry.path[prefix_len:].replace(os.sep, "/"))
 
     icon_paths.sort()
+    _icons_cache = (dir_mtime, icon_paths)
+    global _icons_json_bytes
+    _icons_json_bytes = None  # re-encoded lazily on next response
     return icon_paths
 
 def load_users_from_file():
@@ -369,9 +628,8 @@ def load_users_from_file():
             logging.info("No existing users file found, starting with empty user database")
             return
         
-        with open(USERS_FILE, 'r', encoding='utf-8') as f:
-            global users_db
-            users_db = json.load(f)
+        global users_db
+        users_db = _load_persisted_json(USERS_FILE)
         
         logging.info(f"Loaded {len(users_db)} users from {USERS_FILE}")
         
@@ -380,11 +638,27 @@ def load_users_from_file():
 
 async def periodic_save():
     """Background task to save rooms and users every 10 seconds"""
+    global _users_dirty
     while True:
         try:
             await asyncio.sleep(10)  # Wait 10 seconds
-            save_rooms_to_file()
-            save_users_to_file()
+            # Snapshot on the loop, then serialize + write in a worker
+            # thread so a multi-MB json.dumps doesn't stall every socket
+            # handler for its duration. Only dirty rooms get their shard
+            # rewritten; deleted rooms get their shard removed.
+            if dirty_rooms or _deleted_room_ids:
+                shards: Dict[str, Optional[Dict[str, Any]]] = {
+                    room_id: snapshot_room_data(rooms[room_id])
+                    for room_id in dirty_rooms if room_id in rooms
+                }
+                shards.update({room_id: None for room_id in _deleted_room_ids})
+                dirty_rooms.clear()
+                _deleted_room_ids.clear()
+                await asyncio.to_thread(write_room_shards, shards)
+            if _users_dirty:
+                _users_dirty = False
+                users_data = {username: dict(user) for username, user in users_db.items()}
+                await asyncio.to_thread(write_users_file, users_data)
         except Exception as e:
             logging.error(f"Error in periodic save: {e}")
 
@@ -405,28 +679,59 @@ async def lifespan(app: FastAPI):
     # This maintains compatibility with existing code that references users_db, user_tokens
     global users_db, user_tokens
     users_db = get_all_users()
+    users_lower_index.update({username.lower(): username for username in users_db})
     
     # Load tokens from database (for active sessions)
     # Note: We keep user_tokens in-memory for active sessions, but persist in DB
+
+    # Prime the known-room-id set so room creation never queries SQLite to
+    # check id uniqueness
+    _known_room_ids.update(room_meta['room_id'] for room_meta in get_all_rooms())
     
     logging.info("Database initialized and ready")
-    
+
+    log_listener = setup_async_logging()
+    flusher_task = asyncio.create_task(room_meta_flusher())
+    cursor_task = asyncio.create_task(cursor_flusher())
+    unit_move_task = asyncio.create_task(unit_move_flusher())
+    hex_update_task = asyncio.create_task(hex_update_flusher())
+
     yield
-    
+
     # Shutdown code
     logging.info("Shutdown event")
+    flusher_task.cancel()
+    cursor_task.cancel()
+    unit_move_task.cancel()
+    hex_update_task.cancel()
+    flush_pending_room_meta()
+    log_listener.stop()
     # Database is automatically persisted, no need for manual save
     logging.info("Shutdown completed")
 
 
-app = FastAPI(lifespan=lifespan)
+# Encode HTTP responses with orjson too; the socket.io side already uses it
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+else:
+    app = FastAPI(lifespan=lifespan)
 
 @app.get("/api/unit-icons")
-async def get_unit_icons():
+async def get_unit_icons(request: Request):
     """Return available unit icon paths for client-side search."""
     try:
-        icons = list_unit_icons()
-        return JSONResponse(content={"icons": icons})
+        # The assets mtime doubles as a weak ETag so browsers and CDNs can
+        # revalidate with a 304 instead of re-downloading the list
+        etag = f'W/"{os.stat(UNIT_ICONS_DIR).st_mtime_ns:x}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        # Body is encoded once per assets change, not once per request
+        return Response(
+            content=unit_icons_response_bytes(),
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": "public, max-age=60"},
+        )
     except (FileNotFoundError, NotADirectoryError) as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -539,6 +844,46 @@ async def upload_room_map(room_id: str, request: Request):
         logging.error(f"Error uploading room map: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload map")
 
+@app.get("/api/rooms/{room_id}/state")
+async def get_room_state_http(room_id: str, request: Request):
+    """Serve a room's full state over HTTP.
+
+    Lets clients pull bulk state through a gzipped, cacheable HTTP
+    response instead of receiving it on the socket path; the socket
+    broadcast can shrink to a version/hash notification once the client
+    learns to pull.
+
+    Password-protected rooms are gated the same way the socket join is:
+    the caller must present the room password (X-Room-Password header or
+    password query parameter) or a bearer token for the room owner or an
+    admin.
+    """
+    room_meta = get_room(room_id)
+    if not room_meta:
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    if room_meta.get('has_password'):
+        username = None
+        auth_header = request.headers.get('Authorization')
+        if auth_header and auth_header.startswith('Bearer '):
+            username = get_user_from_token(auth_header.split(' ')[1])
+        is_owner = username is not None and room_meta.get('owner') == username
+        if not (is_owner or (username and is_admin_user(username))):
+            password = (request.headers.get('X-Room-Password')
+                        or request.query_params.get('password', ''))
+            if not await verify_room_password(room_meta, password):
+                raise HTTPException(status_code=403, detail="Invalid room password")
+
+    room_state = get_room_state(room_id)
+    return {
+        'room_id': room_id,
+        'room_version': current_room_version(room_id),
+        'hex_data': room_state['hex_data'],
+        'lines': room_state['lines'],
+        'units': room_state['units'],
+        'map_filename': room_state.get('map_filename'),
+    }
+
 @app.get("/api/room-map/{room_id}")
 async def serve_room_map(room_id: str):
     """Serve the map image for a room"""
@@ -590,6 +935,9 @@ async def serve_room_map(room_id: str):
         logging.error(f"Error serving room map {room_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Compress large JSON bodies (room state pulls especially) on the HTTP path
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -609,14 +957,308 @@ app.add_middleware(
 # Initialize templates
 templates = Jinja2Templates(directory="templates")
 
-sio=socketio.AsyncServer(cors_allowed_origins='*',async_mode='asgi',ping_timeout=2000,ping_interval=1000)
+# Room broadcasts without callbacks are encoded once per emit by
+# python-socketio's AsyncManager and the identical bytes are reused for
+# every recipient, so per-event payload dicts only pay one (orjson) encode
+# regardless of room size. Keep broadcast emits callback-free to stay on
+# that path.
+sio=socketio.AsyncServer(cors_allowed_origins='*',async_mode='asgi',ping_timeout=2000,ping_interval=1000,json=_socketio_json)
 socket_app = socketio.ASGIApp(sio, socketio_path="/ws/socket.io")
 app.mount("/ws", socket_app)
 
 
+# Room ids known to exist, primed from the database at startup and kept in
+# sync by create/delete paths, so id-uniqueness checks never hit SQLite.
+_known_room_ids: Set[str] = set()
+
+# Serializes generate-id -> insert so two concurrent create_room events
+# can't race to the same id and clobber each other's room
+_create_room_lock = asyncio.Lock()
+
+# Lobby room-list cache: the list only changes when rooms are created,
+# deleted, or touched, and many lobby clients poll it. A short TTL plus a
+# version counter bumped by those paths keeps rebuilds rare. The derived
+# hours_since_activity / is_active fields ride along: the shipped client
+# renders them, so they can't be dropped from the payload, but the TTL
+# means they're recomputed at most once per second for all pollers
+# combined rather than per request.
+_ROOMS_LIST_TTL = 1.0
+_rooms_list_cache = {'payload': None, 'expires': 0.0, 'version': -1}
+_rooms_list_version = 0
+
+def bump_rooms_list_version():
+    global _rooms_list_version
+    _rooms_list_version += 1
+
+# Pre-compiled validators: one match call canonicalizes-and-checks instead
+# of a chain of strip/upper/truthiness probes per socket event, and invalid
+# room ids are rejected before any lookup work happens.
+_ROOM_ID_RE = re.compile(r'^[A-Z0-9]{6}$')
+_MAX_ROOM_NAME_LENGTH = 64
+
+# Coalesced room metadata writes. Every hex/line edit used to issue two
+# extra SQLite transactions (update_room_activity + increment_room_version);
+# a brush drag across 50 hexes meant 100 commits. touch_room now bumps an
+# in-memory version (still returned to the emit immediately) and records the
+# pending write; a background task drains the batch in one transaction.
+_room_versions: Dict[str, int] = {}       # room_id -> current version
+_pending_room_meta: Dict[str, tuple] = {}  # room_id -> (last_activity, bumps)
+ROOM_META_FLUSH_INTERVAL = 0.05
+
+def current_room_version(room_id: str) -> int:
+    """Room version as seen in memory, falling back to the stored value"""
+    version = _room_versions.get(room_id)
+    if version is None:
+        room_meta = get_room(room_id)
+        version = room_meta['version'] if room_meta else 0
+    return version
+
+def touch_room(room_id: str, bump_version: bool = True) -> Optional[int]:
+    """Record room activity (and optionally a version bump) for batched flush.
+
+    Returns the new version when bumping, None otherwise.
+    """
+    version = None
+    if bump_version:
+        version = current_room_version(room_id) + 1
+        _room_versions[room_id] = version
+    _, bumps = _pending_room_meta.get(room_id, (0.0, 0))
+    _pending_room_meta[room_id] = (
+        monotonic(),
+        bumps + (1 if bump_version else 0),
+    )
+    return version
+
+def drain_pending_room_meta() -> Dict[str, tuple]:
+    """Snapshot-and-clear the pending batch; must run on the event loop.
+
+    Doing the copy/clear pair loop-side means a touch_room landing
+    mid-flush goes into the next batch instead of being wiped unseen.
+    """
+    batch = dict(_pending_room_meta)
+    _pending_room_meta.clear()
+    return batch
+
+def flush_pending_room_meta():
+    """Drain and persist the pending batch synchronously (shutdown path)"""
+    if not _pending_room_meta:
+        return
+    try:
+        flush_room_meta(drain_pending_room_meta())
+    except Exception as e:
+        logging.error(f"Error flushing room metadata: {e}")
+
+async def room_meta_flusher():
+    """Background task draining coalesced activity/version writes"""
+    while True:
+        await asyncio.sleep(ROOM_META_FLUSH_INTERVAL)
+        if not _pending_room_meta:
+            continue
+        # Drain on the loop, write in a worker thread
+        batch = drain_pending_room_meta()
+        try:
+            await asyncio.to_thread(flush_room_meta, batch)
+        except Exception as e:
+            logging.error(f"Error flushing room metadata: {e}")
+
+# Per-room asyncio locks serializing concurrent mutations of a room's
+# in-memory state (an asyncio.Lock, not threading.Lock: handlers are
+# coroutines and must not block the loop). Uncontended acquisition is a
+# couple of attribute operations, so the hot path barely notices.
+_room_locks: Dict[str, asyncio.Lock] = {}
+
+def room_lock(room_id: str) -> asyncio.Lock:
+    lock = _room_locks.get(room_id)
+    if lock is None:
+        lock = _room_locks[room_id] = asyncio.Lock()
+    return lock
+
+def get_room_overlay_projection(room_id: str) -> Optional[Dict[str, Any]]:
+    """Admin-overlay shape of a room's in-memory state, cached per version.
+
+    The enriched line/unit dicts (room_id/room_name/overlay markers) are
+    built once per room version instead of once per toggle, so repeated
+    admin toggles pay list concatenation rather than O(lines+units) dict
+    spreads.
+    """
+    room = rooms.get(room_id)
+    if room is None:
+        return None
+    version = current_room_version(room_id)
+    cached = room.get('_overlay_cache')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    room_name = room['name']
+    projection = {
+        'colored_hexes': [
+            (hex_key, hex_data['fillColor'])
+            for hex_key, hex_data in room['hex_data'].items()
+            if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray'
+        ],
+        'lines': [
+            line | {
+                'room_id': room_id,
+                'room_name': room_name,
+                'line_id': f"{room_id}_{line.get('id', 'line')}",
+                'overlay': True
+            }
+            for line in room['lines']
+        ],
+        'units': [
+            unit | {
+                'room_id': room_id,
+                'room_name': room_name,
+                'unit_id': f"{room_id}_{unit.get('id', 'unit')}",
+                'is_read_only': True,
+                'overlay': True
+            }
+            for unit in room.get('units', [])
+        ],
+    }
+    room['_overlay_cache'] = (version, projection)
+    return projection
+
+def room_nonempty_hex_count(room: Dict[str, Any]) -> int:
+    """Count of non-default-colored hexes, maintained incrementally.
+
+    The O(hexes) scan only runs once per room (or after a bulk state
+    replacement drops the counter); the paint/erase handlers adjust it by
+    diffing colors, so admin-panel reads are O(1).
+    """
+    count = room.get('nonempty_hex_count')
+    if count is None:
+        count = room['nonempty_hex_count'] = sum(
+            1 for hex_data in room['hex_data'].values()
+            if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray'
+        )
+    return count
+
+def room_cache(room_id: str) -> Dict[str, Any]:
+    """The room's in-memory cache entry, created with empty state on miss.
+
+    Replaces the per-handler `if room_id not in rooms: ...` dance and lets
+    callers hold one local reference instead of re-hashing rooms[room_id]
+    for every field access.
+    """
+    room = rooms.get(room_id)
+    if room is None:
+        room = rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
+    elif 'units' not in room:
+        room['units'] = []
+    return room
+
+def room_units_index(room: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Side index mapping unit id -> unit dict for O(1) lookups.
+
+    Built lazily from the units list and kept in sync by the unit
+    handlers; bulk state replacements drop it for a lazy rebuild. The
+    list stays canonical because snapshots and saves serialize it.
+    """
+    index = room.get('units_index')
+    if index is None:
+        index = room['units_index'] = {
+            unit.get('id'): unit for unit in room.get('units', [])
+        }
+    return index
+
+def room_children_index(room: Dict[str, Any]) -> Dict[str, set]:
+    """Side index mapping parent unit id -> set of child unit ids.
+
+    Lets unit_move update attached children without scanning the whole
+    units list per event. Maintained by add/reparent/delete; bulk state
+    replacements drop it for a lazy rebuild.
+    """
+    index = room.get('children_by_parent')
+    if index is None:
+        index = room['children_by_parent'] = {}
+        for unit in room.get('units', []):
+            parent_id = unit.get('parent_unit_id')
+            if parent_id:
+                index.setdefault(parent_id, set()).add(unit.get('id'))
+    return index
+
+def room_lines_by_hex(room: Dict[str, Any]) -> Dict[str, list]:
+    """Side index mapping endpoint hex key -> incident line dicts.
+
+    Lets hex_erase find (and usually skip) affected lines in O(incident)
+    instead of scanning every line; built lazily, maintained by line_add,
+    dropped on bulk state replacement.
+    """
+    index = room.get('lines_by_hex')
+    if index is None:
+        index = room['lines_by_hex'] = {}
+        for line in room['lines']:
+            for endpoint in ('start', 'end'):
+                key = line.get(endpoint, {}).get('key')
+                if key:
+                    index.setdefault(key, []).append(line)
+    return index
+
+def room_users_list(room_id: str) -> list:
+    """Current users of a room as a list, cached between membership changes.
+
+    Joins append to the cache in place; disconnect/leave paths drop it and
+    the next emit rebuilds lazily. Avoids re-materializing O(users) dicts
+    on every room_created/room_joined emit.
+    """
+    room = rooms.get(room_id)
+    if room is None:
+        return []
+    cache = room.get('users_list_cache')
+    if cache is None:
+        cache = room['users_list_cache'] = list(room['users'].values())
+    return cache
+
+def add_room_user(room_id: str, sid: str, user_info: Dict[str, Any]) -> None:
+    """Add a user to the room roster, keeping the list cache coherent.
+
+    The cache is materialized *before* the sessions-dict insert: a cold
+    rebuild done afterwards would already contain the new user and the
+    append would list them twice.
+    """
+    roster = room_users_list(room_id)
+    rooms[room_id]['users'][sid] = user_info
+    roster.append(user_info)
+
+BROADCAST_BATCH_SIZE = 50
+
+async def batched_emit(event: str, payload: Dict[str, Any], room_id: str, skip_sid: Optional[str] = None):
+    """Broadcast to a room, yielding the loop between batches of sockets.
+
+    sio.emit schedules a send per participant inside one loop tick; for a
+    room with hundreds of clients that stalls every other handler for the
+    duration. Rooms at or under the batch size take the plain emit path.
+    """
+    try:
+        participants = list(sio.manager.get_participants('/', room_id))
+    except KeyError:
+        return
+    # Nothing to do when the room is empty or holds only the sender; skips
+    # the adapter loop and packet encode entirely
+    if not participants:
+        return
+    if skip_sid is not None and len(participants) == 1 and participants[0][0] == skip_sid:
+        return
+    if len(participants) <= BROADCAST_BATCH_SIZE:
+        await sio.emit(event, payload, room=room_id, skip_sid=skip_sid)
+        return
+    for start in range(0, len(participants), BROADCAST_BATCH_SIZE):
+        batch = participants[start:start + BROADCAST_BATCH_SIZE]
+        for participant_sid, _ in batch:
+            if participant_sid != skip_sid:
+                await sio.emit(event, payload, to=participant_sid)
+        # Let queued handlers and pings run between batches
+        await asyncio.sleep(0)
+
 def generate_room_id():
     """Generate a unique 6-character room ID"""
-    return str(uuid.uuid4())[:6].upper()
+    # 3 random bytes render to exactly 6 hex chars: no UUID allocation,
+    # no slicing, cryptographically strong
+    room_id = secrets.token_hex(3).upper()
+    while room_id in _known_room_ids:
+        room_id = secrets.token_hex(3).upper()
+    return room_id
 
 def create_new_room(room_name="Unnamed Room", owner=None, password=None):
     """Create a new room with initial state"""
@@ -626,16 +1268,20 @@ def create_new_room(room_name="Unnamed Room", owner=None, password=None):
         'lines': [],     # list of line objects
         'units': [],     # list of unit objects: {id, name, color, hex_key, created_by}
         'users': {},     # sid -> user_info
-        'created_at': asyncio.get_event_loop().time(),
-        'last_activity': asyncio.get_event_loop().time(),
+        'created_at': monotonic(),
+        'last_activity': monotonic(),
         'owner': owner,  # username of room owner
         'has_password': password is not None,  # Flag to indicate if room has password
         'password_hash': hash_password(password) if password else None  # Hashed password
     }
     return room_data
 
-def verify_room_password(room_data: dict, password: str) -> bool:
-    """Verify password against room's password hash"""
+async def verify_room_password(room_data: dict, password: str) -> bool:
+    """Verify password against room's password hash.
+
+    The 100k-iteration PBKDF2 check runs in a worker thread so it doesn't
+    stall the event loop for every other connection.
+    """
     if not room_data.get('has_password'):
         return True  # No password required
     
@@ -646,11 +1292,14 @@ def verify_room_password(room_data: dict, password: str) -> bool:
     if not room_password_hash:
         return True  # No hash stored (shouldn't happen if has_password is True)
     
-    return verify_password(password, room_password_hash)
+    return await asyncio.to_thread(verify_password, password, room_password_hash)
 
 @sio.on("connect")
 async def handle_connect(sid, environ):
-    print(f'Client connected: {sid}')
+    log.info('Client connected: %s', sid)
+    # Fresh connections sit in the room browser; track them in a lobby
+    # room so list refreshes don't broadcast to in-game sockets
+    await sio.enter_room(sid, 'lobby')
     user_sessions[sid] = {
         'room_id': None,
         'user_name': None,
@@ -660,7 +1309,7 @@ async def handle_connect(sid, environ):
 
 @sio.on('disconnect')
 async def handle_disconnect(sid):
-    print(f'Client disconnected: {sid}')
+    log.info('Client disconnected: %s', sid)
     
     # Remove user from their room if they were in one
     user_data = user_sessions.get(sid)
@@ -670,9 +1319,11 @@ async def handle_disconnect(sid):
         if room_id in rooms and sid in rooms[room_id]['users']:
             # Handle regular room disconnect
             del rooms[room_id]['users'][sid]
+            rooms[room_id].pop('users_list_cache', None)
             
             # Update last activity
-            rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+            rooms[room_id]['last_activity'] = monotonic()
+            mark_rooms_dirty(room_id)
             
             # Notify other users in the room
             await sio.emit('user_left', {
@@ -682,7 +1333,7 @@ async def handle_disconnect(sid):
             
             # Note: We no longer delete empty rooms - they persist for later use
             if len(rooms[room_id]['users']) == 0:
-                print(f'Room {room_id} ({rooms[room_id]["name"]}) is now empty but preserved')
+                log.info('Room %s (%s) is now empty but preserved', room_id, rooms[room_id]['name'])
     
     # Clean up user session
     if sid in user_sessions:
@@ -727,23 +1378,24 @@ async def handle_create_room(sid, data):
         actual_user_name = user_name
         room_owner = None  # Anonymous rooms have no owner
     
-    # Ensure room name is not empty
+    # Ensure room name is not empty, and keep it to a sane length
     if not room_name:
         room_name = 'Unnamed Room'
+    elif len(room_name) > _MAX_ROOM_NAME_LENGTH:
+        room_name = room_name[:_MAX_ROOM_NAME_LENGTH]
     
-    room_id = generate_room_id()
-    
-    # Ensure uniqueness - check database
-    while get_room(room_id) is not None:
-        room_id = generate_room_id()
-    
-    # Hash password if provided
+    # Hash password if provided (in a worker thread; PBKDF2 is ~100ms)
     password_hash = None
     if room_password:
-        password_hash = hash_password(room_password)
+        password_hash = await asyncio.to_thread(hash_password, room_password)
     
-    # Create room in database
-    create_room(room_id, room_name, room_owner, password_hash, map_filename)
+    # Allocate the id and insert under one lock so concurrent creates
+    # can't pick the same id between check and insert
+    async with _create_room_lock:
+        room_id = generate_room_id()
+        create_room(room_id, room_name, room_owner, password_hash, map_filename)
+        _known_room_ids.add(room_id)
+    bump_rooms_list_version()
     
     # Keep in-memory cache for backward compatibility
     rooms[room_id] = {
@@ -752,15 +1404,17 @@ async def handle_create_room(sid, data):
         'lines': [],
         'units': [],
         'users': {},
-        'created_at': asyncio.get_event_loop().time(),
-        'last_activity': asyncio.get_event_loop().time(),
+        'created_at': monotonic(),
+        'last_activity': monotonic(),
         'owner': room_owner,
         'has_password': room_password is not None,
         'password_hash': password_hash,
         'map_filename': map_filename
     }
+    mark_rooms_dirty(room_id)
     
     # Join user to room
+    await sio.leave_room(sid, 'lobby')
     await sio.enter_room(sid, room_id)
     
     # Update user session
@@ -769,38 +1423,45 @@ async def handle_create_room(sid, data):
     user_sessions[sid]['is_admin_room'] = False
     
     # Add user to room (in-memory for active sessions)
-    rooms[room_id]['users'][sid] = {
+    user_info = {
         'name': actual_user_name,
-        'joined_at': asyncio.get_event_loop().time(),
+        'joined_at': monotonic(),
         'is_authenticated': user_data.get('is_authenticated', False),
         'username': user_data.get('username')  # None for anonymous users
     }
+    add_room_user(room_id, sid, user_info)
     
-    # Get room state from database
-    room_state = get_room_state(room_id)
-    
-    print(f'User {actual_user_name} created and joined room {room_id} ({room_name})')
+    log.info('User %s created and joined room %s (%s)', actual_user_name, room_id, room_name)
     
+    # A freshly created room has no state by construction; emitting empty
+    # collections directly skips a pointless get_room_state round-trip
     await sio.emit('room_created', {
         'room_id': room_id,
         'room_name': room_name,
         'user_name': actual_user_name,
         'is_owner': room_owner is not None,
-        'hex_data': room_state['hex_data'],
-        'lines': room_state['lines'],
-        'units': room_state['units'],
-        'users': list(rooms[room_id]['users'].values()),
-        'map_filename': room_state.get('map_filename')
+        'hex_data': {},
+        'lines': [],
+        'units': [],
+        'users': room_users_list(room_id),
+        'map_filename': map_filename
     }, room=sid)
 
 @sio.on('join_room')
 async def handle_join_room(sid, data):
     """Join an existing room"""
     user_data = user_sessions.get(sid, {})
-    room_id = data.get('room_id', '').upper()
+    room_id = data.get('room_id', '').strip().upper()
     user_name = data.get('user_name', 'Anonymous')
     room_password = data.get('room_password', '')
     
+    # Reject malformed ids before doing any lookup work
+    if not _ROOM_ID_RE.match(room_id):
+        await sio.emit('room_error', {
+            'message': 'Room not found'
+        }, room=sid)
+        return
+    
     # Use authenticated username if available, otherwise use provided name
     if user_data.get('is_authenticated'):
         actual_user_name = user_data['username']
@@ -816,13 +1477,15 @@ async def handle_join_room(sid, data):
         return
     
     # Check room password before joining
-    if not verify_room_password(room_meta, room_password):
+    if not await verify_room_password(room_meta, room_password):
         await sio.emit('room_error', {
             'message': 'Invalid room password'
         }, room=sid)
         return
     
-    # Get room state from database
+    # Get room state from database; the metadata part of this is served
+    # from the repository's room cache primed by get_room above, so the
+    # rooms table isn't queried a second time
     room_state = get_room_state(room_id)
     
     # Update in-memory cache for backward compatibility
@@ -841,6 +1504,7 @@ async def handle_join_room(sid, data):
         }
     
     # Join user to room
+    await sio.leave_room(sid, 'lobby')
     await sio.enter_room(sid, room_id)
     
     # Update user session
@@ -849,21 +1513,24 @@ async def handle_join_room(sid, data):
     user_sessions[sid]['is_admin_room'] = False
     
     # Add user to room (in-memory for active sessions)
-    rooms[room_id]['users'][sid] = {
+    user_info = {
         'name': actual_user_name,
-        'joined_at': asyncio.get_event_loop().time(),
+        'joined_at': monotonic(),
         'is_authenticated': user_data.get('is_authenticated', False),
         'username': user_data.get('username')  # None for anonymous users
     }
+    add_room_user(room_id, sid, user_info)
     
     # Update last activity in database
     update_room_activity(room_id)
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+    rooms[room_id]['last_activity'] = monotonic()
+    mark_rooms_dirty(room_id)
+    bump_rooms_list_version()
     
     room_owner = room_state.get('owner')
     is_owner = room_owner and user_data.get('username') == room_owner
     
-    print(f'User {actual_user_name} joined room {room_id} ({room_state["name"]})')
+    log.info('User %s joined room %s (%s)', actual_user_name, room_id, room_state['name'])
     
     # Send current room state to the new user
     await sio.emit('room_joined', {
@@ -874,7 +1541,7 @@ async def handle_join_room(sid, data):
         'hex_data': room_state['hex_data'],
         'lines': room_state['lines'],
         'units': room_state['units'],
-        'users': list(rooms[room_id]['users'].values()),
+        'users': room_users_list(room_id),
         'map_filename': room_state.get('map_filename')
     }, room=sid)
     
@@ -885,14 +1552,39 @@ async def handle_join_room(sid, data):
         'users_count': len(rooms[room_id]['users'])
     }, room=room_id, skip_sid=sid)
 
+# A bulk operation (brush drag, import) fires one admin recompute per
+# event; coalescing per room over a short window collapses a burst into a
+# single aggregate-and-broadcast.
+ADMIN_NOTIFY_DEBOUNCE = 0.05
+_admin_notify_pending: Set[str] = set()
+
+def schedule_admin_notify(room_id: str) -> None:
+    """Debounced admin-room notification for a mutated source room"""
+    if not room_to_admin_rooms.get(room_id):
+        return  # nobody watching; skip even the task
+    if room_id in _admin_notify_pending:
+        return
+    _admin_notify_pending.add(room_id)
+    asyncio.create_task(_flush_admin_notify(room_id))
+
+async def _flush_admin_notify(room_id: str) -> None:
+    await asyncio.sleep(ADMIN_NOTIFY_DEBOUNCE)
+    _admin_notify_pending.discard(room_id)
+    try:
+        await notify_admin_rooms_of_room_update(room_id)
+    except Exception as e:
+        logging.error(f"Error notifying admin rooms for {room_id}: {e}")
+
 async def notify_admin_rooms_of_room_update(updated_room_id: str):
     """Notify all admin rooms that have this room enabled"""
-    for admin_room_id, admin_room in admin_rooms.items():
-        if updated_room_id in admin_room['room_toggles'] and admin_room['room_toggles'][updated_room_id].get('enabled', False):
+    for admin_room_id in room_to_admin_rooms.get(updated_room_id, ()):
+        admin_room = admin_rooms.get(admin_room_id)
+        if admin_room is None:
+            continue
+        if admin_room['room_toggles'].get(updated_room_id, {}).get('enabled', False):
             # Update hex, line, and unit counts for the updated room
             updated_room = rooms[updated_room_id]
-            hex_count = sum(1 for hex_data in updated_room['hex_data'].values() 
-                           if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray')
+            hex_count = room_nonempty_hex_count(updated_room)
             line_count = len(updated_room['lines'])
             unit_count = len(updated_room.get('units', []))
             
@@ -934,29 +1626,39 @@ async def handle_hex_update(sid, data):
     hex_key = data.get('hex_key')
     fill_color = data.get('fill_color')
     
-    # Update in database
-    update_hex(room_id, hex_key, fill_color, user_data.get('user_name'))
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
-    
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if hex_key not in rooms[room_id]['hex_data']:
-        rooms[room_id]['hex_data'][hex_key] = {}
-    rooms[room_id]['hex_data'][hex_key]['fillColor'] = fill_color
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
-    
-    # Broadcast to all users in the room except sender
-    await sio.emit('hex_updated', {
+    # Update database and in-memory cache under the room lock so two
+    # concurrent edits can't interleave their read-modify-write
+    # (activity/version writes are coalesced)
+    async with room_lock(room_id):
+        await asyncio.to_thread(update_hex, room_id, hex_key, fill_color, user_data.get('user_name'))
+        room_version = touch_room(room_id)
+
+        room = room_cache(room_id)
+        entry = room['hex_data'].get(hex_key)
+        old_color = entry.get('fillColor') if entry else None
+        was_colored = bool(old_color) and old_color != 'lightgray'
+        is_colored = bool(fill_color) and fill_color != 'lightgray'
+        if was_colored != is_colored:
+            # Initialize lazily before adjusting so the scan sees the old state
+            count = room_nonempty_hex_count(room)
+            room['nonempty_hex_count'] = count + (1 if is_colored else -1)
+        if entry is None:
+            entry = room['hex_data'][hex_key] = {}
+        entry['fillColor'] = fill_color
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
+    
+    # Queue for the coalescing flusher; repeated strokes over the same hex
+    # within a tick collapse to the final color
+    _pending_hex_updates.setdefault(room_id, {})[hex_key] = ({
         'hex_key': hex_key,
         'fill_color': fill_color,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id, skip_sid=sid)
+    }, sid)
     
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
 
 @sio.on('line_add')
 async def handle_line_add(sid, data):
@@ -976,29 +1678,34 @@ async def handle_line_add(sid, data):
     line_data = data.get('line')
     
     # Generate line ID if not present
-    line_id = line_data.get('id') or f"{room_id}_line_{asyncio.get_event_loop().time()}"
+    line_id = line_data.get('id') or f"{room_id}_line_{monotonic_ns()}"
     line_data['id'] = line_id
     
-    # Add line to database
-    add_line(room_id, line_id, line_data, user_data.get('user_name'))
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
-    
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    rooms[room_id]['lines'].append(line_data)
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+    # Write database and cache under the room lock
+    # (activity/version writes are coalesced)
+    async with room_lock(room_id):
+        await asyncio.to_thread(add_line, room_id, line_id, line_data, user_data.get('user_name'))
+        room_version = touch_room(room_id)
+
+        room = room_cache(room_id)
+        room['lines'].append(line_data)
+        lines_index = room_lines_by_hex(room)
+        for endpoint in ('start', 'end'):
+            key = line_data.get(endpoint, {}).get('key')
+            if key:
+                lines_index.setdefault(key, []).append(line_data)
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
     
     # Broadcast to all users in the room except sender
-    await sio.emit('line_added', {
+    await batched_emit('line_added', {
         'line': line_data,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id, skip_sid=sid)
+    }, room_id, skip_sid=sid)
     
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
 
 @sio.on('hex_erase')
 async def handle_hex_erase(sid, data):
@@ -1017,34 +1724,137 @@ async def handle_hex_erase(sid, data):
     room_id = user_data['room_id']
     hex_key = data.get('hex_key')
     
-    # Erase hex color and connected lines in database (but NOT units)
-    erase_hex(room_id, hex_key)
-    delete_lines_by_hex(room_id, hex_key)
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
-    
-    # Get updated state from database
-    room_state = get_room_state(room_id)
-    
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if hex_key in rooms[room_id]['hex_data']:
-        rooms[room_id]['hex_data'][hex_key]['fillColor'] = 'lightgray'
-    rooms[room_id]['lines'] = room_state['lines']
-    # Note: units are NOT deleted when erasing hex - only colors and lines are removed
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
-    
+    # Erase hex color and connected lines in database (but NOT units),
+    # holding the room lock across the DB writes and cache filter
+    async with room_lock(room_id):
+        await asyncio.to_thread(erase_hex, room_id, hex_key)
+        await asyncio.to_thread(delete_lines_by_hex, room_id, hex_key)
+        room_version = touch_room(room_id)
+
+        # Update in-memory cache by filtering locally with the same predicate
+        # delete_lines_by_hex used; re-reading the whole room state from the
+        # database just to refresh the lines list is wasteful
+        room = room_cache(room_id)
+        entry = room['hex_data'].get(hex_key)
+        if entry is not None:
+            old_color = entry.get('fillColor')
+            if old_color and old_color != 'lightgray':
+                count = room_nonempty_hex_count(room)
+                room['nonempty_hex_count'] = count - 1
+            entry['fillColor'] = 'lightgray'
+        lines_index = room_lines_by_hex(room)
+        incident_lines = lines_index.pop(hex_key, None)
+        if incident_lines:
+            removed = {id(line) for line in incident_lines}
+            room['lines'] = [line for line in room['lines'] if id(line) not in removed]
+            # Unlink the removed lines from their other endpoints too
+            for line in incident_lines:
+                for endpoint in ('start', 'end'):
+                    other_key = line.get(endpoint, {}).get('key')
+                    if other_key and other_key != hex_key:
+                        others = lines_index.get(other_key)
+                        if others:
+                            lines_index[other_key] = [
+                                l for l in others if id(l) != id(line)
+                            ]
+        remaining_lines = room['lines']
+        # Note: units are NOT deleted when erasing hex - only colors and lines are removed
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
+
     # Broadcast to all users in the room except sender
-    await sio.emit('hex_erased', {
+    await batched_emit('hex_erased', {
         'hex_key': hex_key,
-        'lines': room_state['lines'],
+        'lines': remaining_lines,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id, skip_sid=sid)
-    
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    }, room_id, skip_sid=sid)
+    
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
+
+# replace_room_state is advertised for bulk imports; chunked imports drive
+# several full-state replacements back-to-back, each of which is a full
+# table rewrite plus a whole-state broadcast. Replacement is last-write-
+# wins, so buffering the newest payload per room for a short window and
+# flushing once is semantically identical and collapses the burst.
+REPLACE_DEBOUNCE_INTERVAL = 0.2
+_pending_replacements: Dict[str, Dict[str, Any]] = {}  # room_id -> pending import
+
+async def _flush_room_replacement(room_id: str):
+    await asyncio.sleep(REPLACE_DEBOUNCE_INTERVAL)
+    pending = _pending_replacements.pop(room_id, None)
+    if pending is None:
+        return
+    try:
+        await apply_room_replacement(room_id, pending)
+    except Exception as e:
+        logging.error(f"Error applying room state replacement for {room_id}: {e}")
+
+def schedule_room_replacement(room_id: str, pending: Dict[str, Any]):
+    """Buffer the newest full-state import for a room and schedule its flush"""
+    already_scheduled = room_id in _pending_replacements
+    _pending_replacements[room_id] = pending
+    if not already_scheduled:
+        asyncio.create_task(_flush_room_replacement(room_id))
+
+# Brush drags fire hex_update at pointer frequency; like cursor and unit
+# moves, broadcasts coalesce per (room, hex) with last-write-wins and a
+# ticker flushes them, keeping the per-hex hex_updated event the client
+# already understands.
+HEX_UPDATE_FLUSH_INTERVAL = 0.016
+_pending_hex_updates: Dict[str, Dict[str, tuple]] = {}  # room_id -> hex_key -> (payload, skip_sid)
+
+async def hex_update_flusher():
+    """Background task draining coalesced hex color updates"""
+    while True:
+        await asyncio.sleep(HEX_UPDATE_FLUSH_INTERVAL)
+        if not _pending_hex_updates:
+            continue
+        pending = dict(_pending_hex_updates)
+        _pending_hex_updates.clear()
+        for room_id, by_hex in pending.items():
+            for payload, skip_sid in by_hex.values():
+                await batched_emit('hex_updated', payload, room_id, skip_sid=skip_sid)
+
+# Cursor moves arrive at mouse-move frequency (60+ Hz per user); instead of
+# broadcasting each one, the latest position per user is buffered and a
+# ticker emits it at most once per interval, so broadcast traffic scales
+# with the tick rate rather than input frequency. The wire event stays
+# cursor_moved, just rate-limited.
+CURSOR_FLUSH_INTERVAL = 0.033
+_pending_cursor_updates: Dict[str, Dict[str, dict]] = {}  # room_id -> sid -> payload
+
+async def cursor_flusher():
+    """Background task draining coalesced cursor positions"""
+    while True:
+        await asyncio.sleep(CURSOR_FLUSH_INTERVAL)
+        if not _pending_cursor_updates:
+            continue
+        pending = dict(_pending_cursor_updates)
+        _pending_cursor_updates.clear()
+        for room_id, by_sid in pending.items():
+            for cursor_sid, payload in by_sid.items():
+                await sio.emit('cursor_moved', payload, room=room_id, skip_sid=cursor_sid)
+
+# unit_move arrives continuously while a unit is dragged; only the latest
+# position per unit matters, so moves are coalesced per (room, unit) and a
+# ticker broadcasts them at most once per interval. The wire event stays
+# unit_moved so the shipped client needs no changes.
+UNIT_MOVE_FLUSH_INTERVAL = 0.033
+_pending_unit_moves: Dict[str, Dict[str, tuple]] = {}  # room_id -> unit_id -> (payload, skip_sid)
+
+async def unit_move_flusher():
+    """Background task draining coalesced unit positions"""
+    while True:
+        await asyncio.sleep(UNIT_MOVE_FLUSH_INTERVAL)
+        if not _pending_unit_moves:
+            continue
+        pending = dict(_pending_unit_moves)
+        _pending_unit_moves.clear()
+        for room_id, by_unit in pending.items():
+            for payload, skip_sid in by_unit.values():
+                await batched_emit('unit_moved', payload, room_id, skip_sid=skip_sid)
 
 @sio.on('cursor_update')
 async def handle_cursor_update(sid, data):
@@ -1056,21 +1866,40 @@ async def handle_cursor_update(sid, data):
     room_id = user_data['room_id']
     if room_id not in rooms:
         return
-    
-    # Broadcast cursor position to other users in the room
-    await sio.emit('cursor_moved', {
-        'user_name': user_data['user_name'],
-        'hex_key': data.get('hex_key'),
-        'mode': data.get('mode')
-    }, room=room_id, skip_sid=sid)
+
+    # Users dwell on one hex for many mouse events; skip the no-op updates
+    hex_key = data.get('hex_key')
+    mode = data.get('mode')
+    if (hex_key == user_data.get('last_cursor_hex')
+            and mode == user_data.get('last_cursor_mode')):
+        return
+    user_data['last_cursor_hex'] = hex_key
+    user_data['last_cursor_mode'] = mode
+
+    # Record the latest position in the session's reusable payload dict
+    # (mutated in place; the hottest handler allocates nothing per event)
+    payload = user_data.get('cursor_payload')
+    if payload is None:
+        payload = user_data['cursor_payload'] = {'user_name': user_data['user_name']}
+    payload['user_name'] = user_data['user_name']
+    payload['hex_key'] = hex_key
+    payload['mode'] = mode
+    _pending_cursor_updates.setdefault(room_id, {})[sid] = payload
 
 @sio.on('get_rooms')
 async def handle_get_rooms(sid):
     """Get list of available rooms"""
+    now = monotonic()
+    if (_rooms_list_cache['payload'] is not None
+            and now < _rooms_list_cache['expires']
+            and _rooms_list_cache['version'] == _rooms_list_version):
+        await sio.emit('rooms_list', _rooms_list_cache['payload'], room=sid)
+        return
+
     room_list = []
-    current_time = asyncio.get_event_loop().time()
+    current_time = monotonic()
     
-    # Get rooms from database
+    # Get rooms from database (already ordered by last_activity DESC)
     db_rooms = get_all_rooms()
     
     for room_meta in db_rooms:
@@ -1093,10 +1922,12 @@ async def handle_get_rooms(sid):
             'has_password': room_meta['has_password']
         })
     
-    # Sort by last activity (most recent first)
-    room_list.sort(key=lambda x: x['last_activity'], reverse=True)
+    payload = {'rooms': room_list}
+    _rooms_list_cache['payload'] = payload
+    _rooms_list_cache['expires'] = now + _ROOMS_LIST_TTL
+    _rooms_list_cache['version'] = _rooms_list_version
     
-    await sio.emit('rooms_list', {'rooms': room_list}, room=sid)
+    await sio.emit('rooms_list', payload, room=sid)
 
 @sio.on('leave_room')
 async def handle_leave_room(sid):
@@ -1113,13 +1944,17 @@ async def handle_leave_room(sid):
         # Handle leaving regular room
         # Remove user from room
         del rooms[room_id]['users'][sid]
+        rooms[room_id].pop('users_list_cache', None)
         
         # Update last activity in database
         update_room_activity(room_id)
-        rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+        rooms[room_id]['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
+        bump_rooms_list_version()
         
-        # Leave the socket.io room
+        # Leave the socket.io room and rejoin the browser lobby
         await sio.leave_room(sid, room_id)
+        await sio.enter_room(sid, 'lobby')
         
         # Notify other users in the room
         await sio.emit('user_left', {
@@ -1128,11 +1963,11 @@ async def handle_leave_room(sid):
         }, room=room_id)
         
         room_name = rooms[room_id].get('name', 'Unknown')
-        print(f'User {user_data["user_name"]} left room {room_id} ({room_name})')
+        log.info('User %s left room %s (%s)', user_data['user_name'], room_id, room_name)
         
         # Note: Room persists even if empty
         if len(rooms[room_id]['users']) == 0:
-            print(f'Room {room_id} ({room_name}) is now empty but preserved')
+            log.info('Room %s (%s) is now empty but preserved', room_id, room_name)
     
     # Clear user's room association
     user_sessions[sid]['room_id'] = None
@@ -1170,16 +2005,21 @@ async def handle_delete_room(sid, data):
     # Delete the room from database
     room_name = room_meta['name']
     delete_room(room_id)
+    _known_room_ids.discard(room_id)
+    bump_rooms_list_version()
     
     # Remove from in-memory cache
     if room_id in rooms:
         del rooms[room_id]
+    _room_locks.pop(room_id, None)
+    mark_room_deleted(room_id)
     
     # Remove user from room
     user_sessions[sid]['room_id'] = None
     await sio.leave_room(sid, room_id)
+    await sio.enter_room(sid, 'lobby')
     
-    print(f'Room {room_id} ({room_name}) deleted by {user_data["user_name"]}')
+    log.info('Room %s (%s) deleted by %s', room_id, room_name, user_data['user_name'])
     
     await sio.emit('room_deleted', {
         'message': f'Room "{room_name}" has been deleted'
@@ -1187,7 +2027,7 @@ async def handle_delete_room(sid, data):
 
 @sio.on('message')
 async def handle_message(sid, data):
-    print(f'Message from {sid}: {data}')
+    log.debug('Message from %s: %s', sid, data)
 
 @sio.on('get_admin_data_for_room')
 async def handle_get_admin_data_for_room(sid):
@@ -1278,18 +2118,34 @@ async def handle_admin_toggle_room(sid, data):
     
     # Calculate hex, line, and unit counts for the target room
     target_room = rooms[target_room_id]
-    hex_count = sum(1 for hex_data in target_room['hex_data'].values() 
-                   if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray')
+    hex_count = room_nonempty_hex_count(target_room)
     line_count = len(target_room['lines'])
     unit_count = len(target_room.get('units', []))
     
+    # Duplicate taps are common from the UI: if the requested state matches
+    # what this admin already has and the target room hasn't changed since
+    # (version-keyed, so a mere recolor still counts as a change), skip the
+    # rebuild and answer with a lightweight ack so the client isn't left
+    # waiting on a tap that did nothing
+    target_room_version = current_room_version(target_room_id)
+    existing = user_sessions[sid]['admin_toggles'].get(target_room_id)
+    if (existing is not None
+            and existing.get('enabled') == enabled
+            and existing.get('room_version') == target_room_version):
+        await sio.emit('admin_toggle_ack', {
+            'room_id': target_room_id,
+            'enabled': enabled
+        }, room=sid)
+        return
+
     # Update toggle state
     user_sessions[sid]['admin_toggles'][target_room_id] = {
         'enabled': enabled,
         'room_name': target_room['name'],
         'hex_count': hex_count,
         'line_count': line_count,
-        'unit_count': unit_count
+        'unit_count': unit_count,
+        'room_version': target_room_version
     }
     
     # Get overlay data for enabled rooms
@@ -1297,54 +2153,42 @@ async def handle_admin_toggle_room(sid, data):
     overlay_lines = list(rooms[current_room_id]['lines'])
     overlay_units = list(rooms[current_room_id].get('units', []))
     
-    # Add data from enabled rooms
+    # Add data from enabled rooms via their cached overlay projections
     for room_id, toggle_data in user_sessions[sid]['admin_toggles'].items():
         if toggle_data.get('enabled', False) and room_id in rooms:
-            room = rooms[room_id]
-            
-            # Overlay hex data (keep original structure but overlay colors)
-            for hex_key, hex_data in room['hex_data'].items():
-                if hex_data.get('fillColor') and hex_data['fillColor'] != 'lightgray':
-                    if hex_key not in overlay_hex_data:
-                        overlay_hex_data[hex_key] = {'fillColor': 'lightgray'}
-                    
-                    # Create layered information
-                    if not hasattr(overlay_hex_data[hex_key], 'rooms'):
-                        overlay_hex_data[hex_key]['rooms'] = []
-                    
-                    overlay_hex_data[hex_key]['rooms'] = overlay_hex_data[hex_key].get('rooms', [])
-                    overlay_hex_data[hex_key]['rooms'].append({
-                        'room_id': room_id,
-                        'room_name': room['name'],
-                        'fillColor': hex_data['fillColor']
-                    })
-                    
-                    # Use the overlay color as primary if current hex is empty
-                    if overlay_hex_data[hex_key]['fillColor'] == 'lightgray':
-                        overlay_hex_data[hex_key]['fillColor'] = hex_data['fillColor']
+            projection = get_room_overlay_projection(room_id)
+            if not projection:
+                continue
+            room_name = rooms[room_id]['name']
             
-            # Add lines with room information
-            for line in room['lines']:
-                overlay_line = {
-                    **line,
+            # Overlay hex data (keep original structure but overlay colors).
+            # Entries inherited from the current room are shared with live
+            # room state, so copy them before mutating: the old code
+            # appended 'rooms' lists straight into rooms[...]['hex_data']
+            # (its hasattr(dict, 'rooms') guard could never fire), leaking
+            # overlay bookkeeping into saves and later toggles.
+            for hex_key, fill_color in projection['colored_hexes']:
+                entry = overlay_hex_data.get(hex_key)
+                if entry is None:
+                    entry = overlay_hex_data[hex_key] = {'fillColor': 'lightgray', 'rooms': []}
+                elif 'rooms' not in entry:
+                    entry = overlay_hex_data[hex_key] = dict(entry)
+                    entry['rooms'] = []
+
+                # Create layered information
+                entry['rooms'].append({
                     'room_id': room_id,
-                    'room_name': room['name'],
-                    'line_id': f"{room_id}_{line.get('id', 'line')}",
-                    'overlay': True
-                }
-                overlay_lines.append(overlay_line)
+                    'room_name': room_name,
+                    'fillColor': fill_color
+                })
+
+                # Use the overlay color as primary if current hex is empty
+                if entry['fillColor'] == 'lightgray':
+                    entry['fillColor'] = fill_color
             
-            # Add units with room information
-            for unit in room.get('units', []):
-                overlay_unit = {
-                    **unit,
-                    'room_id': room_id,
-                    'room_name': room['name'],
-                    'unit_id': f"{room_id}_{unit.get('id', 'unit')}",
-                    'is_read_only': True,
-                    'overlay': True
-                }
-                overlay_units.append(overlay_unit)
+            # Cached lists are concatenated, never mutated
+            overlay_lines.extend(projection['lines'])
+            overlay_units.extend(projection['units'])
     
     # Send updated overlay data to the admin user
     await sio.emit('admin_room_overlay_updated', {
@@ -1385,31 +2229,35 @@ async def register_user(user_data: UserRegister):
         if not password or len(password) < 4:
             raise HTTPException(status_code=400, detail="Password must be at least 4 characters long")
         
-        # Check if username already exists
-        if get_user(username):
+        # Check if username already exists via the O(1) case-folded index;
+        # login matches case-insensitively, so registration must too or the
+        # earlier spelling becomes unreachable
+        if username.lower() in users_lower_index or get_user(username):
             raise HTTPException(status_code=409, detail="Username already exists")
         
         # Check if this is the first user (make them admin)
         all_users = get_all_users()
         is_first_user = len(all_users) == 0
         
-        # Hash password and create user
-        password_hash = hash_password(password)
+        # Hash password and create user (hash in a worker thread)
+        password_hash = await asyncio.to_thread(hash_password, password)
         create_user(username, password_hash, is_first_user)
         
         # Update in-memory cache
         users_db[username] = {
             'username': username,
             'password_hash': password_hash,
-            'created_at': asyncio.get_event_loop().time(),
+            'created_at': monotonic(),
             'last_login': None,
             'is_admin': is_first_user
         }
+        mark_users_dirty()
         
         # Generate token for automatic login
         token = generate_token()
         create_token(token, username)
         user_tokens[token] = username  # Keep in-memory for backward compatibility
+        users_lower_index[username.lower()] = username
         
         logging.info(f"New user registered: {username}" + (" (admin)" if is_first_user else ""))
         
@@ -1432,29 +2280,35 @@ async def login_user(user_data: UserLogin):
     username = user_data.username.strip()
     password = user_data.password
     
-    # Find user (case-insensitive) - check database first
-    all_users = get_all_users()
-    actual_username = None
-    for stored_username in all_users.keys():
-        if stored_username.lower() == username.lower():
-            actual_username = stored_username
-            break
+    # Find user (case-insensitive) via the O(1) lowercase index instead of
+    # scanning every stored username per login attempt
+    actual_username = users_lower_index.get(username.lower())
     
     if not actual_username:
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
-    user = get_user(actual_username)
+    user = get_user_cached(actual_username)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
-    # Verify password
-    if not verify_password(password, user['password_hash']):
+    # Verify password (in a worker thread so concurrent logins don't
+    # serialize the event loop behind 100k PBKDF2 iterations each)
+    if not await asyncio.to_thread(verify_password, password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
+    # Transparently upgrade legacy 100k-iteration hashes now that the
+    # plaintext is in hand
+    if password_hash_is_legacy(user['password_hash']):
+        new_hash = await asyncio.to_thread(hash_password, password)
+        await asyncio.to_thread(update_user_password_hash, actual_username, new_hash)
+        user['password_hash'] = new_hash
+        users_db[actual_username] = user
+    
     # Update last login
     update_user_last_login(actual_username)
     users_db[actual_username] = user  # Update cache
-    users_db[actual_username]['last_login'] = asyncio.get_event_loop().time()
+    users_db[actual_username]['last_login'] = monotonic()
+    mark_users_dirty()
     
     # Generate token
     token = generate_token()
@@ -1526,6 +2380,7 @@ async def promote_to_admin(request: Request):
         
         # Update cache
         users_db[target_username] = get_user(target_username)
+        mark_users_dirty()
         
         logging.info(f"User {target_username} promoted to admin by {requesting_username}")
         
@@ -1571,6 +2426,7 @@ async def update_user_admin_flag(username: str, body: AdminUserUpdate, request:
     updated = get_user(username)
     if updated:
         users_db[username] = updated
+        mark_users_dirty()
     logging.info(f"User {username} is_admin set to {body.is_admin} by {admin_username}")
     return {
         "message": "User updated",
@@ -1578,6 +2434,18 @@ async def update_user_admin_flag(username: str, body: AdminUserUpdate, request:
         "is_admin": body.is_admin,
     }
 
+@app.post("/api/admin/checkpoint")
+async def admin_wal_checkpoint(request: Request):
+    """Checkpoint and truncate the SQLite WAL file (admin only)."""
+    admin_username = require_admin_bearer(request)
+    try:
+        wal_checkpoint()
+    except Exception as e:
+        logging.error(f"WAL checkpoint failed: {e}")
+        raise HTTPException(status_code=500, detail="Checkpoint failed")
+    logging.info(f"WAL checkpoint run by {admin_username}")
+    return {"message": "Checkpoint completed"}
+
 @app.get("/api/verify-token")
 async def verify_token(request: Request):
     """Verify token and return user info"""
@@ -1615,11 +2483,19 @@ async def manual_save_rooms():
         logging.error(f"Manual save failed: {e}")
         return {"success": False, "message": str(e)}
 
+# Dashboard pollers hit /api/rooms-status repeatedly; the payload is
+# O(rooms) dicts to build, so share one build per second across them.
+_ROOMS_STATUS_TTL = 1.0
+_rooms_status_cache: Optional[tuple] = None  # (expires_at, payload)
+
 @app.get("/api/rooms-status")
 async def get_rooms_status():
     """Get current rooms status (for admin/debugging)"""
+    global _rooms_status_cache
     try:
-        current_time = asyncio.get_event_loop().time()
+        current_time = monotonic()
+        if _rooms_status_cache is not None and current_time < _rooms_status_cache[0]:
+            return _rooms_status_cache[1]
         status = {
             "total_rooms": len(rooms),
             "active_rooms": len([r for r in rooms.values() if len(r['users']) > 0]),
@@ -1640,6 +2516,7 @@ async def get_rooms_status():
                 "lines_count": len(room_data['lines'])
             })
         
+        _rooms_status_cache = (current_time + _ROOMS_STATUS_TTL, status)
         return status
     except Exception as e:
         return {"error": str(e)}
@@ -1674,33 +2551,41 @@ if UNIT_ICONS_DIR.exists() and UNIT_ICONS_DIR.is_dir():
 else:
     logging.warning(f"Unit icons directory missing or invalid: {UNIT_ICONS_DIR}")
 
+# Walk the build directory once at startup so the catch-all route resolves
+# requests with a set lookup instead of two stat syscalls per request.
+# The build only changes on redeploy, which restarts the process anyway.
+def build_static_manifest() -> frozenset:
+    base = resolve_frontend_build_path()
+    if not base:
+        return frozenset()
+    # as_posix: URL paths always use forward slashes, str() would key
+    # nested files with os.sep and never match on Windows
+    return frozenset(
+        p.relative_to(base).as_posix() for p in Path(base).rglob('*') if p.is_file()
+    )
+
+STATIC_FILES_MANIFEST = build_static_manifest()
+
 # Catch-all route for React app (must be at the end)
 @app.get("/{full_path:path}")
 async def serve_react_app(full_path: str, request: Request):
     """Serve React app for all non-API routes"""
-    from fastapi.responses import FileResponse
-    import os
-    
     # Skip API routes and WebSocket routes
     if full_path.startswith(("api/", "ws/")):
         raise HTTPException(status_code=404, detail="Not found")
     
-    # Check if the requested path is a file in the build directory
     frontend_build_path = resolve_frontend_build_path()
     if not frontend_build_path:
         raise HTTPException(status_code=404, detail="React app not found")
-    file_path = os.path.join(frontend_build_path, full_path)
     
-    # If it's a file and exists, serve it (for favicon, manifest, etc.)
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        return FileResponse(file_path)
+    # Serve real files (favicon, manifest, etc.) via the startup manifest
+    if full_path in STATIC_FILES_MANIFEST:
+        return FileResponse(os.path.join(frontend_build_path, full_path))
     
     # Otherwise serve index.html for React routing
-    build_path = os.path.join(frontend_build_path, "index.html")
-    if os.path.exists(build_path):
-        return FileResponse(build_path)
-    else:
-        raise HTTPException(status_code=404, detail="React app not found")
+    if "index.html" in STATIC_FILES_MANIFEST:
+        return FileResponse(os.path.join(frontend_build_path, "index.html"))
+    raise HTTPException(status_code=404, detail="React app not found")
 
 @sio.on('unit_add')
 async def handle_unit_add(sid, data):
@@ -1725,32 +2610,34 @@ async def handle_unit_add(sid, data):
     unit_id = unit_data.get('id') or str(uuid.uuid4())[:8]
     unit_data['id'] = unit_id
     unit_data['created_by'] = user_data['user_name']
-    unit_data['created_at'] = asyncio.get_event_loop().time()
+    unit_data['created_at'] = monotonic()
     
-    # Add unit to database
-    add_unit(room_id, unit_id, unit_data, user_data['user_name'])
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
+    async with room_lock(room_id):
+        # Add unit to database
+        await asyncio.to_thread(add_unit, room_id, unit_id, unit_data, user_data['user_name'])
+        room_version = touch_room(room_id)
     
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if 'units' not in rooms[room_id]:
-        rooms[room_id]['units'] = []
-    rooms[room_id]['units'].append(unit_data)
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+        # Update in-memory cache
+        room = room_cache(room_id)
+        room['units'].append(unit_data)
+        room_units_index(room)[unit_id] = unit_data
+        if unit_data.get('parent_unit_id'):
+            room_children_index(room).setdefault(
+                unit_data['parent_unit_id'], set()).add(unit_id)
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
     
-    print(f"Unit added to room {room_id}: {unit_data}")
+    log.debug('Unit added to room %s: %s', room_id, unit_data)
     
     # Broadcast to all users in the room (including sender for confirmation)
-    await sio.emit('unit_added', {
+    await batched_emit('unit_added', {
         'unit': unit_data,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id)
+    }, room_id)
     
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
 
 @sio.on('unit_update')
 async def handle_unit_update(sid, data):
@@ -1770,24 +2657,21 @@ async def handle_unit_update(sid, data):
     if not unit_id or not isinstance(patch, dict):
         return
 
-    update_unit(room_id, unit_id, patch, user_data['user_name'])
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
+    async with room_lock(room_id):
+        await asyncio.to_thread(update_unit, room_id, unit_id, patch, user_data['user_name'])
+        room_version = touch_room(room_id)
 
-    updated = get_unit(room_id, unit_id)
-    if not updated:
-        return
+        updated = get_unit(room_id, unit_id)
+        if not updated:
+            return
 
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if 'units' not in rooms[room_id]:
-        rooms[room_id]['units'] = []
-    for idx, unit in enumerate(rooms[room_id]['units']):
-        if unit.get('id') == unit_id:
-            rooms[room_id]['units'][idx] = {**unit, **updated}
-            break
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+        # Update in-memory cache (O(1) via the unit index)
+        room = room_cache(room_id)
+        unit = room_units_index(room).get(unit_id)
+        if unit is not None:
+            unit.update(updated)
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
 
     await sio.emit('unit_updated', {
         'unit': updated,
@@ -1795,7 +2679,7 @@ async def handle_unit_update(sid, data):
         'room_version': room_version
     }, room=room_id)
 
-    await notify_admin_rooms_of_room_update(room_id)
+    schedule_admin_notify(room_id)
 
 @sio.on('unit_reparent')
 async def handle_unit_reparent(sid, data):
@@ -1816,24 +2700,29 @@ async def handle_unit_reparent(sid, data):
     if not unit_id:
         return
 
-    reparent_unit(room_id, unit_id, parent_unit_id, hex_key, user_data['user_name'])
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
+    async with room_lock(room_id):
+        await asyncio.to_thread(reparent_unit, room_id, unit_id, parent_unit_id, hex_key, user_data['user_name'])
+        room_version = touch_room(room_id)
 
-    updated = get_unit(room_id, unit_id)
-    if not updated:
-        return
+        updated = get_unit(room_id, unit_id)
+        if not updated:
+            return
 
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if 'units' not in rooms[room_id]:
-        rooms[room_id]['units'] = []
-    for idx, unit in enumerate(rooms[room_id]['units']):
-        if unit.get('id') == unit_id:
-            rooms[room_id]['units'][idx] = {**unit, **updated}
-            break
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+        # Update in-memory cache (O(1) via the unit index), moving the unit
+        # between parents in the children index
+        room = room_cache(room_id)
+        unit = room_units_index(room).get(unit_id)
+        if unit is not None:
+            children_index = room_children_index(room)
+            old_parent_id = unit.get('parent_unit_id')
+            if old_parent_id:
+                children_index.get(old_parent_id, set()).discard(unit_id)
+            unit.update(updated)
+            new_parent_id = unit.get('parent_unit_id')
+            if new_parent_id:
+                children_index.setdefault(new_parent_id, set()).add(unit_id)
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
 
     await sio.emit('unit_updated', {
         'unit': updated,
@@ -1841,7 +2730,7 @@ async def handle_unit_reparent(sid, data):
         'room_version': room_version
     }, room=room_id)
 
-    await notify_admin_rooms_of_room_update(room_id)
+    schedule_admin_notify(room_id)
 
 @sio.on('unit_move')
 async def handle_unit_move(sid, data):
@@ -1861,39 +2750,40 @@ async def handle_unit_move(sid, data):
     unit_id = data.get('unit_id')
     new_hex_key = data.get('hex_key')
     
-    # Move unit in database
-    move_unit(room_id, unit_id, new_hex_key, user_data['user_name'])
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
-    
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if 'units' not in rooms[room_id]:
-        rooms[room_id]['units'] = []
-    for unit in rooms[room_id]['units']:
-        if unit['id'] == unit_id:
-            unit['hex_key'] = new_hex_key
-            unit['moved_by'] = user_data['user_name']
-            unit['moved_at'] = asyncio.get_event_loop().time()
-            break
-    for unit in rooms[room_id]['units']:
-        if unit.get('parent_unit_id') == unit_id:
-            unit['hex_key'] = new_hex_key
-            unit['moved_by'] = user_data['user_name']
-            unit['moved_at'] = asyncio.get_event_loop().time()
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+    async with room_lock(room_id):
+        # Move unit in database
+        await asyncio.to_thread(move_unit, room_id, unit_id, new_hex_key, user_data['user_name'])
+        room_version = touch_room(room_id)
     
-    # Broadcast to all users in the room except sender
-    await sio.emit('unit_moved', {
+        # Update in-memory cache
+        room = room_cache(room_id)
+        now = monotonic()
+        units_index = room_units_index(room)
+        moved_unit = units_index.get(unit_id)
+        if moved_unit is not None:
+            moved_unit['hex_key'] = new_hex_key
+            moved_unit['moved_by'] = user_data['user_name']
+            moved_unit['moved_at'] = now
+        for child_id in room_children_index(room).get(unit_id, ()):
+            child = units_index.get(child_id)
+            if child is not None:
+                child['hex_key'] = new_hex_key
+                child['moved_by'] = user_data['user_name']
+                child['moved_at'] = now
+        room['last_activity'] = now
+        mark_rooms_dirty(room_id)
+    
+    # Queue for the coalescing flusher; a drag burst becomes one broadcast
+    # per unit per tick instead of one per mouse step
+    _pending_unit_moves.setdefault(room_id, {})[unit_id] = ({
         'unit_id': unit_id,
         'hex_key': new_hex_key,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id, skip_sid=sid)
+    }, sid)
     
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
 
 @sio.on('unit_delete')
 async def handle_unit_delete(sid, data):
@@ -1912,28 +2802,31 @@ async def handle_unit_delete(sid, data):
     room_id = user_data['room_id']
     unit_id = data.get('unit_id')
     
-    # Delete unit from database
-    delete_unit(room_id, unit_id)
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
+    async with room_lock(room_id):
+        # Delete unit from database
+        await asyncio.to_thread(delete_unit, room_id, unit_id)
+        room_version = touch_room(room_id)
     
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {'hex_data': {}, 'lines': [], 'units': []}
-    if 'units' not in rooms[room_id]:
-        rooms[room_id]['units'] = []
-    rooms[room_id]['units'] = [unit for unit in rooms[room_id]['units'] if unit['id'] != unit_id]
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
+        # Update in-memory cache
+        room = room_cache(room_id)
+        room['units'] = [unit for unit in room['units'] if unit['id'] != unit_id]
+        deleted_unit = room_units_index(room).pop(unit_id, None)
+        children_index = room_children_index(room)
+        if deleted_unit is not None and deleted_unit.get('parent_unit_id'):
+            children_index.get(deleted_unit['parent_unit_id'], set()).discard(unit_id)
+        children_index.pop(unit_id, None)
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
     
     # Broadcast to all users in the room except sender
-    await sio.emit('unit_deleted', {
+    await batched_emit('unit_deleted', {
         'unit_id': unit_id,
         'user_name': user_data['user_name'],
         'room_version': room_version
-    }, room=room_id, skip_sid=sid)
+    }, room_id, skip_sid=sid)
     
-    # Notify admin rooms that have this room enabled
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms that have this room enabled (debounced)
+    schedule_admin_notify(room_id)
 
 @sio.on('admin_delete_room')
 async def handle_admin_delete_room(sid, data):
@@ -1947,8 +2840,8 @@ async def handle_admin_delete_room(sid, data):
         }, room=sid)
         return
     
-    target_room_id = data.get('room_id', '').upper()
-    if not target_room_id:
+    target_room_id = data.get('room_id', '').strip().upper()
+    if not _ROOM_ID_RE.match(target_room_id):
         await sio.emit('room_error', {
             'message': 'Room ID is required'
         }, room=sid)
@@ -1967,41 +2860,57 @@ async def handle_admin_delete_room(sid, data):
     
     # Notify all users in the room that it's being deleted
     if len(active_users) > 0:
-        await sio.emit('room_deleted', {
+        await batched_emit('room_deleted', {
             'message': f'This room has been deleted by an administrator',
             'force_leave': True
-        }, room=target_room_id)
+        }, target_room_id)
         
-        # Remove all users from the room
-        for user_sid in list(active_users.keys()):
+        # Clear the session bookkeeping, then evict everyone in one adapter
+        # pass instead of awaiting leave_room per sid
+        for user_sid in active_users:
             if user_sid in user_sessions:
                 user_sessions[user_sid]['room_id'] = None
                 user_sessions[user_sid]['is_admin_room'] = False
-            await sio.leave_room(user_sid, target_room_id)
+        await sio.close_room(target_room_id)
+        # Evicted sockets land back on the room browser
+        for user_sid in active_users:
+            await sio.enter_room(user_sid, 'lobby')
     
     # Delete the room from database
     delete_room(target_room_id)
+    _known_room_ids.discard(target_room_id)
+    bump_rooms_list_version()
     
     # Remove from in-memory cache
     if target_room_id in rooms:
         del rooms[target_room_id]
-    
-    # Update all admin rooms that might have this room in their toggles
-    for admin_room_id, admin_room_data in admin_rooms.items():
-        if target_room_id in admin_room_data['room_toggles']:
+    _room_locks.pop(target_room_id, None)
+    mark_room_deleted(target_room_id)
+    
+    # Update all admin rooms that might have this room in their toggles,
+    # then push every notification concurrently instead of awaiting each
+    # emit in sequence
+    notify_tasks = []
+    for admin_room_id in list(room_to_admin_rooms.get(target_room_id, ())):
+        admin_room_data = admin_rooms.get(admin_room_id)
+        if admin_room_data is not None and target_room_id in admin_room_data['room_toggles']:
             del admin_room_data['room_toggles'][target_room_id]
-            
+            unlink_room_from_admin_room(target_room_id, admin_room_id)
+
             # Notify admin room users about the deletion
             aggregated_data = get_aggregated_room_data(admin_room_id)
-            await sio.emit('admin_room_data_updated', {
+            notify_tasks.append(sio.emit('admin_room_data_updated', {
                 'hex_data': aggregated_data['hex_data'],
                 'lines': aggregated_data['lines'],
                 'units': aggregated_data['units'],
                 'room_toggles': admin_room_data['room_toggles'],
                 'deleted_room_name': room_name
-            }, room=admin_room_id)
+            }, room=admin_room_id))
+    room_to_admin_rooms.pop(target_room_id, None)
+    if notify_tasks:
+        await asyncio.gather(*notify_tasks)
     
-    print(f'Room {target_room_id} ({room_name}) deleted by admin {user_data["username"]}')
+    log.info('Room %s (%s) deleted by admin %s', target_room_id, room_name, user_data['username'])
     
     # Confirm deletion to the admin
     await sio.emit('room_deleted', {
@@ -2010,11 +2919,11 @@ async def handle_admin_delete_room(sid, data):
         'admin_action': True
     }, room=sid)
     
-    # Refresh room list for all users by emitting a broadcast signal
+    # Refresh the room list only for sockets on the room browser
     await sio.emit('room_list_refresh', {
         'deleted_room_id': target_room_id,
         'deleted_room_name': room_name
-    }, broadcast=True)
+    }, room='lobby')
 
 @sio.on('replace_room_state')
 async def handle_replace_room_state(sid, data):
@@ -2044,34 +2953,53 @@ async def handle_replace_room_state(sid, data):
         }, room=sid)
         return
     
-    hex_data = data.get('hex_data', {})
-    lines = data.get('lines', [])
-    units = data.get('units', [])
-    
-    # Replace state in database
-    replace_room_state(room_id, hex_data, lines, units, user_data.get('user_name'))
-    update_room_activity(room_id)
-    room_version = increment_room_version(room_id)
-    
-    # Get updated state
-    room_state = get_room_state(room_id)
-    
-    # Update in-memory cache
-    if room_id not in rooms:
-        rooms[room_id] = {}
-    rooms[room_id]['hex_data'] = room_state['hex_data']
-    rooms[room_id]['lines'] = room_state['lines']
-    rooms[room_id]['units'] = room_state['units']
-    rooms[room_id]['last_activity'] = asyncio.get_event_loop().time()
-    
-    # Broadcast to all users in the room
-    await sio.emit('room_state_replaced', {
+    # Buffer the import; a burst of chunked replace calls collapses into
+    # one database rewrite and one broadcast when the debounce window ends
+    schedule_room_replacement(room_id, {
+        'hex_data': data.get('hex_data', {}),
+        'lines': data.get('lines', []),
+        'units': data.get('units', []),
+        'user_name': user_data.get('user_name'),
+    })
+
+async def apply_room_replacement(room_id: str, pending: Dict[str, Any]):
+    """Write a buffered full-state import and broadcast the result"""
+    hex_data = pending['hex_data']
+    lines = pending['lines']
+    units = pending['units']
+    user_name = pending['user_name']
+    
+    # Hold the room lock across the DB rewrite and cache swap, like every
+    # other mutation path: an unlocked flush could interleave with a
+    # suspended hex/line/unit handler and leave memory diverged from the
+    # freshly wiped tables
+    async with room_lock(room_id):
+        # Replace state in database; the write returns the normalized state,
+        # so no full-table read-back is needed
+        room_state = await asyncio.to_thread(replace_room_state, room_id, hex_data, lines, units, user_name)
+        room_version = touch_room(room_id)
+
+        # Update in-memory cache
+        room = room_cache(room_id)
+        room['hex_data'] = room_state['hex_data']
+        room['lines'] = room_state['lines']
+        room['units'] = room_state['units']
+        room.pop('nonempty_hex_count', None)  # recomputed lazily
+        room.pop('units_index', None)  # rebuilt lazily
+        room.pop('children_by_parent', None)  # rebuilt lazily
+        room.pop('lines_by_hex', None)  # rebuilt lazily
+        room['last_activity'] = monotonic()
+        mark_rooms_dirty(room_id)
+    
+    # Broadcast to all users in the room, yielding between batches - the
+    # full-state payload is the largest thing this server sends
+    await batched_emit('room_state_replaced', {
         'hex_data': room_state['hex_data'],
         'lines': room_state['lines'],
         'units': room_state['units'],
-        'user_name': user_data['user_name'],
+        'user_name': user_name,
         'room_version': room_version
-    }, room=room_id)
+    }, room_id)
     
-    # Notify admin rooms
-    await notify_admin_rooms_of_room_update(room_id)
+    # Notify admin rooms (debounced)
+    schedule_admin_notify(room_id)
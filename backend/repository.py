@@ -1,18 +1,44 @@
 """Repository layer for database operations"""
 import sqlite3
 import logging
-import asyncio
 import json
 import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
-from db import get_db_connection, db_transaction, database_exists
+from time import monotonic
+from db import get_db_connection, release_db_connection, db_transaction, database_exists
 
 logger = logging.getLogger(__name__)
 
 def get_current_time() -> float:
-    """Get current time as float (for compatibility with existing code)"""
-    return asyncio.get_event_loop().time()
+    """Get current time as float (for compatibility with existing code).
+
+    time.monotonic is the clock asyncio's loop uses, and unlike
+    get_event_loop() it also works from the worker threads that now run
+    the write path.
+    """
+    return monotonic()
+
+
+# orjson serializes straight to compact bytes in C, several times faster
+# than stdlib json; fall back to stdlib when it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _pack_payload(payload: Dict[str, Any]) -> bytes:
+        """Serialize a line payload to compact JSON bytes for BLOB storage"""
+        return orjson.dumps(payload)
+
+    _unpack_payload = orjson.loads
+else:
+    def _pack_payload(payload: Dict[str, Any]) -> bytes:
+        """Serialize a line payload to compact JSON bytes for BLOB storage"""
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+    _unpack_payload = json.loads
 
 # User operations
 def create_user(username: str, password_hash: str, is_admin: bool = False) -> None:
@@ -41,7 +67,7 @@ def get_user(username: str) -> Optional[Dict[str, Any]]:
             }
         return None
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def update_user_last_login(username: str) -> None:
     """Update user's last login time"""
@@ -51,6 +77,15 @@ def update_user_last_login(username: str) -> None:
             UPDATE users SET last_login = ? WHERE username = ?
         """, (get_current_time(), username))
 
+def update_user_password_hash(username: str, password_hash: str) -> None:
+    """Replace a user's stored password hash (e.g. legacy-format upgrade)"""
+    with db_transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (password_hash, username),
+        )
+
 def set_user_admin(username: str, is_admin: bool) -> None:
     """Set admin flag for a user."""
     with db_transaction() as conn:
@@ -77,7 +112,7 @@ def get_all_users() -> Dict[str, Dict[str, Any]]:
             }
         return users
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 # Token operations
 def create_token(token: str, username: str, expires_in_hours: Optional[int] = None) -> None:
@@ -107,7 +142,7 @@ def get_token_username(token: str) -> Optional[str]:
         row = cursor.fetchone()
         return row['username'] if row else None
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def delete_token(token: str) -> None:
     """Delete a token"""
@@ -121,6 +156,26 @@ def delete_all_user_tokens(username: str) -> None:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM tokens WHERE username = ?", (username,))
 
+# Room metadata is read many times per socket event (get_room_state and
+# most handlers start with it), so cache it briefly per room. Entries are
+# dropped on any write to that room, and the TTL bounds staleness for
+# writes that bypass this module.
+_ROOM_CACHE_TTL = 5.0
+_room_cache: Dict[str, tuple] = {}  # room_id -> (cached_at, room dict)
+
+# Full room-state reads (hexes + lines + units) are far more expensive, so
+# they get their own cache, dropped by every state- or metadata-mutating
+# helper in this module. Bounded so long-dead rooms don't pin memory.
+_ROOM_STATE_CACHE_MAX = 256
+_room_state_cache: Dict[str, Dict[str, Any]] = {}
+
+def _invalidate_room_cache(room_id: str) -> None:
+    _room_cache.pop(room_id, None)
+    _room_state_cache.pop(room_id, None)
+
+def _invalidate_room_state_cache(room_id: str) -> None:
+    _room_state_cache.pop(room_id, None)
+
 # Room operations
 def create_room(room_id: str, room_name: str, owner_username: Optional[str] = None, 
                 password_hash: Optional[str] = None, map_filename: Optional[str] = None) -> None:
@@ -134,9 +189,13 @@ def create_room(room_id: str, room_name: str, owner_username: Optional[str] = No
             VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
         """, (room_id, room_name, owner_username, 1 if password_hash else 0, 
               password_hash, current_time, current_time, map_filename))
+    _invalidate_room_cache(room_id)
 
 def get_room(room_id: str) -> Optional[Dict[str, Any]]:
     """Get room metadata"""
+    cached = _room_cache.get(room_id)
+    if cached and monotonic() - cached[0] < _ROOM_CACHE_TTL:
+        return dict(cached[1])
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
@@ -145,7 +204,7 @@ def get_room(room_id: str) -> Optional[Dict[str, Any]]:
         if row:
             # SQLite Row objects don't have .get(), use dictionary access
             # map_filename column exists due to migration, may be None if not set
-            return {
+            room = {
                 'room_id': row['room_id'],
                 'name': row['name'],
                 'owner': row['owner_username'],
@@ -156,59 +215,47 @@ def get_room(room_id: str) -> Optional[Dict[str, Any]]:
                 'version': row['version'],
                 'map_filename': row['map_filename']  # Column exists due to migration, may be None
             }
+            _room_cache[room_id] = (monotonic(), dict(room))
+            return room
         return None
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def get_room_state(room_id: str) -> Dict[str, Any]:
     """Get complete room state including hexes, lines, and units"""
+    cached = _room_state_cache.get(room_id)
+    if cached is not None:
+        return cached
     conn = get_db_connection()
     try:
+        # Bulk scans skip the sqlite3.Row factory: a room load can touch
+        # thousands of rows and the per-row Row allocation (plus column-name
+        # hashing) roughly doubles the cost versus plain tuples.
         cursor = conn.cursor()
-        
+        cursor.row_factory = None
+
         # Get room metadata
         room = get_room(room_id)
         if not room:
             raise ValueError(f"Room {room_id} not found")
-        
+
         # Get hexes
         cursor.execute("SELECT hex_key, fill_color FROM hexes WHERE room_id = ?", (room_id,))
-        hex_data = {}
-        for row in cursor.fetchall():
-            hex_data[row['hex_key']] = {'fillColor': row['fill_color']}
-        
+        hex_data = {hex_key: {'fillColor': fill_color} for hex_key, fill_color in cursor.fetchall()}
+
         # Get lines
-        cursor.execute("SELECT payload_json FROM lines WHERE room_id = ? ORDER BY created_at", (room_id,))
-        lines = []
-        for row in cursor.fetchall():
-            lines.append(json.loads(row['payload_json']))
-        
+        cursor.execute("SELECT payload FROM lines WHERE room_id = ? ORDER BY created_at", (room_id,))
+        lines = [_unpack_payload(payload) for (payload,) in cursor.fetchall()]
+
         # Get units
         cursor.execute("""
             SELECT unit_id, name, color, hex_key, icon_path, tint_color, description, parent_unit_id,
                    created_by, created_at, moved_by, moved_at
             FROM units WHERE room_id = ? ORDER BY created_at
         """, (room_id,))
-        units = []
-        for row in cursor.fetchall():
-            unit = {
-                'id': row['unit_id'],
-                'name': row['name'],
-                'color': row['color'],
-                'hex_key': row['hex_key'],
-                'icon_path': row['icon_path'],
-                'tint_color': row['tint_color'],
-                'description': row['description'],
-                'parent_unit_id': row['parent_unit_id'],
-                'created_by': row['created_by'],
-                'created_at': row['created_at']
-            }
-            if row['moved_by']:
-                unit['moved_by'] = row['moved_by']
-                unit['moved_at'] = row['moved_at']
-            units.append(unit)
+        units = [_unit_from_row(row) for row in cursor.fetchall()]
         
-        return {
+        state = {
             'name': room['name'],
             'hex_data': hex_data,
             'lines': lines,
@@ -221,8 +268,12 @@ def get_room_state(room_id: str) -> Dict[str, Any]:
             'version': room['version'],
             'map_filename': room.get('map_filename')
         }
+        if len(_room_state_cache) >= _ROOM_STATE_CACHE_MAX:
+            _room_state_cache.pop(next(iter(_room_state_cache)))
+        _room_state_cache[room_id] = state
+        return state
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def update_room_activity(room_id: str) -> None:
     """Update room's last activity timestamp"""
@@ -231,6 +282,7 @@ def update_room_activity(room_id: str) -> None:
         cursor.execute("""
             UPDATE rooms SET last_activity = ? WHERE room_id = ?
         """, (get_current_time(), room_id))
+    _invalidate_room_cache(room_id)
 
 def update_room_map(room_id: str, map_filename: Optional[str]) -> None:
     """Update room's map filename"""
@@ -239,6 +291,26 @@ def update_room_map(room_id: str, map_filename: Optional[str]) -> None:
         cursor.execute("""
             UPDATE rooms SET map_filename = ? WHERE room_id = ?
         """, (map_filename, room_id))
+    _invalidate_room_cache(room_id)
+
+def flush_room_meta(updates: Dict[str, tuple]) -> None:
+    """Persist coalesced room activity/version updates in one transaction.
+
+    `updates` maps room_id -> (last_activity, version_bumps). Called by the
+    background flusher in main so a burst of edits costs one commit instead
+    of two writes per edit.
+    """
+    if not updates:
+        return
+    rows = [(last_activity, bumps, room_id)
+            for room_id, (last_activity, bumps) in updates.items()]
+    with db_transaction() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            UPDATE rooms SET last_activity = ?, version = version + ? WHERE room_id = ?
+        """, rows)
+    for room_id in updates:
+        _invalidate_room_cache(room_id)
 
 def increment_room_version(room_id: str) -> int:
     """Increment room version and return new version"""
@@ -249,13 +321,15 @@ def increment_room_version(room_id: str) -> int:
         """, (room_id,))
         cursor.execute("SELECT version FROM rooms WHERE room_id = ?", (room_id,))
         row = cursor.fetchone()
-        return row['version'] if row else 1
+    _invalidate_room_cache(room_id)
+    return row['version'] if row else 1
 
 def delete_room(room_id: str) -> None:
     """Delete a room (cascade deletes hexes, lines, units)"""
     with db_transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+    _invalidate_room_cache(room_id)
 
 def get_all_rooms() -> List[Dict[str, Any]]:
     """Get all rooms with metadata"""
@@ -278,7 +352,7 @@ def get_all_rooms() -> List[Dict[str, Any]]:
             })
         return rooms
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 # Hex operations
 def update_hex(room_id: str, hex_key: str, fill_color: str, updated_by: Optional[str] = None) -> None:
@@ -298,33 +372,70 @@ def update_hex(room_id: str, hex_key: str, fill_color: str, updated_by: Optional
                     updated_at = excluded.updated_at,
                     updated_by = excluded.updated_by
             """, (room_id, hex_key, fill_color, current_time, updated_by))
+    _invalidate_room_state_cache(room_id)
+
+def bulk_upsert_hexes(room_id: str, updates: List[tuple], updated_by: Optional[str] = None) -> None:
+    """Upsert many hexes in one transaction.
+
+    `updates` is a list of (hex_key, fill_color) pairs. One BEGIN/COMMIT
+    covers the whole batch (a single fsync instead of one per hex) and
+    executemany reuses the prepared statement across rows. Default-colored
+    hexes are deleted to preserve sparse storage.
+    """
+    current_time = get_current_time()
+    deletes = [(room_id, hex_key) for hex_key, fill_color in updates if fill_color == 'lightgray']
+    upserts = [(room_id, hex_key, fill_color, current_time, updated_by)
+               for hex_key, fill_color in updates if fill_color != 'lightgray']
+    with db_transaction() as conn:
+        cursor = conn.cursor()
+        if deletes:
+            cursor.executemany("DELETE FROM hexes WHERE room_id = ? AND hex_key = ?", deletes)
+        if upserts:
+            cursor.executemany("""
+                INSERT INTO hexes (room_id, hex_key, fill_color, updated_at, updated_by)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(room_id, hex_key) DO UPDATE SET
+                    fill_color = excluded.fill_color,
+                    updated_at = excluded.updated_at,
+                    updated_by = excluded.updated_by
+            """, upserts)
+    _invalidate_room_state_cache(room_id)
 
 def erase_hex(room_id: str, hex_key: str) -> None:
     """Erase a hex (set to default or delete)"""
     with db_transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM hexes WHERE room_id = ? AND hex_key = ?", (room_id, hex_key))
+    _invalidate_room_state_cache(room_id)
 
 # Line operations
-def add_line(room_id: str, line_id: str, line_data: Dict[str, Any], created_by: Optional[str] = None) -> None:
-    """Add a line"""
+def add_line(room_id: str, line_id: str, line_data: Dict[str, Any], created_by: Optional[str] = None) -> Dict[str, Any]:
+    """Add a line and return the stored payload.
+
+    RETURNING fuses the insert with the read-back so broadcasting the
+    stored line costs one statement instead of an INSERT plus a SELECT.
+    """
     current_time = get_current_time()
     with db_transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            INSERT INTO lines (room_id, line_id, payload_json, created_at, created_by)
+            INSERT INTO lines (room_id, line_id, payload, created_at, created_by)
             VALUES (?, ?, ?, ?, ?)
-        """, (room_id, line_id, json.dumps(line_data), current_time, created_by))
+            RETURNING payload
+        """, (room_id, line_id, _pack_payload(line_data), current_time, created_by))
+        row = cursor.fetchone()
+        _invalidate_room_state_cache(room_id)
+        return _unpack_payload(row['payload'])
 
 def delete_lines_by_hex(room_id: str, hex_key: str) -> None:
     """Delete all lines connected to a hex"""
     with db_transaction() as conn:
         cursor = conn.cursor()
         # Get all lines for the room
-        cursor.execute("SELECT line_id, payload_json FROM lines WHERE room_id = ?", (room_id,))
+        cursor.execute("SELECT line_id, payload FROM lines WHERE room_id = ?", (room_id,))
         lines_to_delete = []
         for row in cursor.fetchall():
-            line_data = json.loads(row['payload_json'])
+            line_data = _unpack_payload(row['payload'])
             if (line_data.get('start', {}).get('key') == hex_key or 
                 line_data.get('end', {}).get('key') == hex_key):
                 lines_to_delete.append(row['line_id'])
@@ -332,20 +443,50 @@ def delete_lines_by_hex(room_id: str, hex_key: str) -> None:
         # Delete matching lines
         for line_id in lines_to_delete:
             cursor.execute("DELETE FROM lines WHERE line_id = ?", (line_id,))
+    _invalidate_room_state_cache(room_id)
 
 def get_room_lines(room_id: str) -> List[Dict[str, Any]]:
     """Get all lines for a room"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT payload_json FROM lines WHERE room_id = ? ORDER BY created_at", (room_id,))
-        return [json.loads(row['payload_json']) for row in cursor.fetchall()]
+        cursor.row_factory = None
+        cursor.execute("SELECT payload FROM lines WHERE room_id = ? ORDER BY created_at", (room_id,))
+        return [_unpack_payload(payload) for (payload,) in cursor.fetchall()]
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+
+def _unit_from_row(row: Any) -> Dict[str, Any]:
+    """Convert a units row to the dict shape used across the API.
+
+    Works on plain tuples as well as sqlite3.Row; every units SELECT in
+    this module projects the same column order.
+    """
+    unit: Dict[str, Any] = {
+        'id': row[0],
+        'name': row[1],
+        'color': row[2],
+        'hex_key': row[3],
+        'icon_path': row[4],
+        'tint_color': row[5],
+        'description': row[6],
+        'parent_unit_id': row[7],
+        'created_by': row[8],
+        'created_at': row[9],
+    }
+    if row[10]:
+        unit['moved_by'] = row[10]
+        unit['moved_at'] = row[11]
+    return unit
 
 # Unit operations
-def add_unit(room_id: str, unit_id: str, unit_data: Dict[str, Any], created_by: Optional[str] = None) -> None:
-    """Add a unit"""
+def add_unit(room_id: str, unit_id: str, unit_data: Dict[str, Any], created_by: Optional[str] = None) -> Dict[str, Any]:
+    """Add a unit and return the stored row.
+
+    RETURNING fuses the insert with the read-back so broadcasting the
+    created unit costs one statement instead of an INSERT plus a SELECT.
+    """
     current_time = get_current_time()
     with db_transaction() as conn:
         cursor = conn.cursor()
@@ -356,6 +497,9 @@ def add_unit(room_id: str, unit_id: str, unit_data: Dict[str, Any], created_by:
                 created_at, created_by
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING unit_id, name, color, hex_key, icon_path, tint_color,
+                      description, parent_unit_id, created_by, created_at,
+                      moved_by, moved_at
         """, (
             room_id,
             unit_id,
@@ -369,6 +513,8 @@ def add_unit(room_id: str, unit_id: str, unit_data: Dict[str, Any], created_by:
             current_time,
             created_by,
         ))
+        _invalidate_room_state_cache(room_id)
+        return _unit_from_row(cursor.fetchone())
 
 def move_unit(room_id: str, unit_id: str, new_hex_key: str, moved_by: Optional[str] = None) -> None:
     """Move a unit to a new hex"""
@@ -384,12 +530,14 @@ def move_unit(room_id: str, unit_id: str, new_hex_key: str, moved_by: Optional[s
             UPDATE units SET hex_key = ?, moved_at = ?, moved_by = ?
             WHERE room_id = ? AND parent_unit_id = ?
         """, (new_hex_key, current_time, moved_by, room_id, unit_id))
+    _invalidate_room_state_cache(room_id)
 
 def delete_unit(room_id: str, unit_id: str) -> None:
     """Delete a unit"""
     with db_transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM units WHERE room_id = ? AND unit_id = ?", (room_id, unit_id))
+    _invalidate_room_state_cache(room_id)
 
 def get_unit(room_id: str, unit_id: str) -> Optional[Dict[str, Any]]:
     """Get a unit by ID."""
@@ -404,24 +552,9 @@ def get_unit(room_id: str, unit_id: str) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         if not row:
             return None
-        unit: Dict[str, Any] = {
-            'id': row['unit_id'],
-            'name': row['name'],
-            'color': row['color'],
-            'hex_key': row['hex_key'],
-            'icon_path': row['icon_path'],
-            'tint_color': row['tint_color'],
-            'description': row['description'],
-            'parent_unit_id': row['parent_unit_id'],
-            'created_by': row['created_by'],
-            'created_at': row['created_at'],
-        }
-        if row['moved_by']:
-            unit['moved_by'] = row['moved_by']
-            unit['moved_at'] = row['moved_at']
-        return unit
+        return _unit_from_row(row)
     finally:
-        conn.close()
+        release_db_connection(conn)
 
 def update_unit(room_id: str, unit_id: str, patch: Dict[str, Any], updated_by: Optional[str] = None) -> None:
     """Update mutable unit fields."""
@@ -452,6 +585,7 @@ def update_unit(room_id: str, unit_id: str, patch: Dict[str, Any], updated_by: O
             f"UPDATE units SET {', '.join(set_parts)} WHERE room_id = ? AND unit_id = ?",
             tuple(values),
         )
+    _invalidate_room_state_cache(room_id)
 
 def reparent_unit(
     room_id: str,
@@ -487,16 +621,22 @@ def reparent_unit(
                 SET parent_unit_id = NULL, hex_key = ?, moved_at = ?, moved_by = ?
                 WHERE room_id = ? AND unit_id = ?
             """, (hex_key, current_time, moved_by, room_id, unit_id))
+    _invalidate_room_state_cache(room_id)
 
 def delete_units_by_hex(room_id: str, hex_key: str) -> None:
     """Delete all units on a hex"""
     with db_transaction() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM units WHERE room_id = ? AND hex_key = ?", (room_id, hex_key))
+    _invalidate_room_state_cache(room_id)
 
 def replace_room_state(room_id: str, hex_data: Dict[str, Any], lines: List[Dict[str, Any]], 
-                      units: List[Dict[str, Any]], updated_by: Optional[str] = None) -> None:
-    """Replace entire room state (for bulk imports)"""
+                      units: List[Dict[str, Any]], updated_by: Optional[str] = None) -> Dict[str, Any]:
+    """Replace entire room state (for bulk imports).
+
+    Returns the normalized state as stored (sparse hexes, filtered units),
+    so callers don't need to read the whole room back after the write.
+    """
     current_time = get_current_time()
     with db_transaction() as conn:
         cursor = conn.cursor()
@@ -507,23 +647,27 @@ def replace_room_state(room_id: str, hex_data: Dict[str, Any], lines: List[Dict[
         cursor.execute("DELETE FROM units WHERE room_id = ?", (room_id,))
         
         # Insert hexes (sparse - only non-default colors)
-        for hex_key, hex_info in hex_data.items():
-            fill_color = hex_info.get('fillColor', 'lightgray')
-            if fill_color != 'lightgray':
-                cursor.execute("""
-                    INSERT INTO hexes (room_id, hex_key, fill_color, updated_at, updated_by)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (room_id, hex_key, fill_color, current_time, updated_by))
+        hex_rows = [
+            (room_id, hex_key, hex_info.get('fillColor', 'lightgray'), current_time, updated_by)
+            for hex_key, hex_info in hex_data.items()
+            if hex_info.get('fillColor', 'lightgray') != 'lightgray'
+        ]
+        if hex_rows:
+            cursor.executemany("""
+                INSERT INTO hexes (room_id, hex_key, fill_color, updated_at, updated_by)
+                VALUES (?, ?, ?, ?, ?)
+            """, hex_rows)
         
         # Insert lines
         for idx, line in enumerate(lines):
             line_id = line.get('id') or f"{room_id}_line_{idx}"
             cursor.execute("""
-                INSERT INTO lines (room_id, line_id, payload_json, created_at, created_by)
+                INSERT INTO lines (room_id, line_id, payload, created_at, created_by)
                 VALUES (?, ?, ?, ?, ?)
-            """, (room_id, line_id, json.dumps(line), current_time, updated_by))
+            """, (room_id, line_id, _pack_payload(line), current_time, updated_by))
         
         # Insert units
+        normalized_units = []
         for unit in units:
             unit_id = unit.get('id') or unit.get('unit_id')
             if not unit_id:
@@ -543,6 +687,28 @@ def replace_room_state(room_id: str, hex_data: Dict[str, Any], lines: List[Dict[
                   unit.get('parent_unit_id'),
                   current_time,
                   updated_by))
+            normalized_units.append({
+                'id': unit_id,
+                'name': unit['name'],
+                'color': unit['color'],
+                'hex_key': unit['hex_key'],
+                'icon_path': unit.get('icon_path'),
+                'tint_color': unit.get('tint_color'),
+                'description': unit.get('description'),
+                'parent_unit_id': unit.get('parent_unit_id'),
+                'created_by': updated_by,
+                'created_at': current_time,
+            })
+    _invalidate_room_state_cache(room_id)
+    return {
+        'hex_data': {
+            hex_key: {'fillColor': hex_info.get('fillColor', 'lightgray')}
+            for hex_key, hex_info in hex_data.items()
+            if hex_info.get('fillColor', 'lightgray') != 'lightgray'
+        },
+        'lines': list(lines),
+        'units': normalized_units,
+    }
 
 def migrate_json_to_sqlite(rooms_file: str = "room_data/rooms.json", 
                            users_file: str = "room_data/users.json") -> None: